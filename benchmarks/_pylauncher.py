@@ -0,0 +1,16 @@
+# Import modules of pylauncher for benchmarks.
+#
+# Uses the loader of the tests (tests/_pylauncher.py), so both import the
+# package the same way: installed package if available, otherwise src/.
+
+import os
+import importlib.util
+
+_loader_path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            os.pardir, "tests", "_pylauncher.py")
+_spec = importlib.util.spec_from_file_location("pylauncher_tests_loader",
+                                               _loader_path)
+_loader = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_loader)
+
+pylauncher_module = _loader.pylauncher_module
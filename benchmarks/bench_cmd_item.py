@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+#
+# Micro-benchmark of launcher_cmd_item construction.
+#
+# Compares building command items with the command template parsed for
+# every item (as before templates were introduced) with items built from
+# templates compiled once per mapping.
+#
+# Usage: python benchmarks/bench_cmd_item.py [-n ITEMS] [-r REPEAT]
+
+from __future__ import print_function
+from __future__ import division
+
+import os
+import sys
+import json
+import timeit
+import argparse
+
+import pyparsing
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _pylauncher import pylauncher_module
+
+launcher_model = pylauncher_module("launcher_model")
+
+
+def legacy_cmd(item_cfg, item):
+    """Resolve command as launcher_cmd_item did before templates."""
+    cmd = item_cfg.get("command")
+    arg_flags = item_cfg.get("arg_flags", dict())
+    expr = pyparsing.nestedExpr('{', '}', ignoreExpr=None)
+    args = expr.parseString("{" + cmd + "}")
+
+    params = dict()
+    for arg in args[0]:
+        arg = arg[0]
+        if item.get(arg):
+            params[arg] = arg_flags.get(arg, "") + " " + item.get(arg)
+        else:
+            params[arg] = ""
+    return cmd.format(**params)
+
+
+def generate_items(n):
+    items = list()
+    for i in range(n):
+        item_type = ("caqtdm", "medm", "cmd")[i % 3]
+        items.append({"type": item_type, "text": "Item %d" % i,
+                      "panel": "panel_%d.ui" % i, "macros": "P=%d" % i,
+                      "command": "echo %d" % i})
+    return items
+
+
+def main():
+    args_pars = argparse.ArgumentParser()
+    args_pars.add_argument('-n', '--items', type=int, default=5000)
+    args_pars.add_argument('-r', '--repeat', type=int, default=3)
+    args = args_pars.parse_args()
+
+    mapping_path = os.path.join(os.path.dirname(launcher_model.__file__),
+                                "resources", "mapping", "mapping.json")
+    with open(mapping_path) as mapping_file:
+        launcher_cfg = json.load(mapping_file)["Linux"]
+    compiled_cfg = launcher_model.compile_launcher_cfg(launcher_cfg)
+    items = generate_items(args.items)
+
+    def before():
+        for item in items:
+            launcher_model.launcher_menu_model_item(None, item)
+            legacy_cmd(launcher_cfg[item["type"]], item)
+
+    def after():
+        for item in items:
+            launcher_model.launcher_cmd_item(None, compiled_cfg[item["type"]],
+                                             dict(item))
+
+    for name, function in (("per item parsing", before),
+                           ("compiled templates", after)):
+        best = min(timeit.repeat(function, number=1, repeat=args.repeat))
+        print("%-20s %8.3f s %10.0f items/s" % (name, best,
+                                                args.items / best))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+#
+# Benchmark of the convert.py line tokenizers.
+#
+# Lines of TCL configurations (*.config files found in given paths, by
+# default the test fixtures, and a generated tree) are split with
+# split_tcl_line and with pyparsing.nestedExpr, and the generated tree is
+# converted with both tokenizers. That both give the same result is checked
+# by tests/test_convert_tokenizer.py.
+#
+# Usage: python benchmarks/bench_convert_tokenizer.py [--size SIZE]
+#            [-r REPEAT] [PATH ...]
+
+from __future__ import print_function
+from __future__ import division
+
+import os
+import io
+import sys
+import timeit
+import argparse
+import tempfile
+import shutil
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _pylauncher import pylauncher_module
+from generate import TREE_SIZES, generate_tcl_tree
+
+convert = pylauncher_module("convert.convert")
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            os.pardir, "tests", "fixtures", "convert")
+
+
+def pyparsing_split(line):
+    return convert.LauncherMenuModel.pyparsing_split_line(line)
+
+
+def config_lines(paths):
+    """Return logical lines of all *.config files in paths."""
+    lines = list()
+    for path in paths:
+        if os.path.isfile(path):
+            files = [path]
+        else:
+            files = list()
+            for dir_path, dir_names, file_names in os.walk(path):
+                files.extend(os.path.join(dir_path, file_name)
+                             for file_name in file_names
+                             if file_name.endswith(".config"))
+        for file_path in sorted(files):
+            for line_number, line, comment in \
+                    convert.read_tcl_lines(file_path):
+                if not comment:
+                    lines.append(line)
+    return lines
+
+
+def convert_tree(tcl_path, out_dir, tokenizer):
+    with contextlib.redirect_stdout(io.StringIO()):
+        parser = convert.LauncherMenuModelParser(tcl_path, out_dir, True)
+        parser.parse(tokenizer=tokenizer)
+
+
+def main():
+    args_pars = argparse.ArgumentParser()
+    args_pars.add_argument('paths', nargs='*', default=[FIXTURES_DIR],
+                           help="*.config files or directories with them "
+                                "(default: tests/fixtures/convert/)")
+    args_pars.add_argument('--size', default="medium",
+                           choices=sorted(TREE_SIZES),
+                           help="size of generated tree (default: medium)")
+    args_pars.add_argument('-r', '--repeat', type=int, default=3)
+    args = args_pars.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="pylauncher-tokenizer-")
+    try:
+        tcl_path = generate_tcl_tree(os.path.join(work_dir, "tcl"),
+                                     args.size)
+        lines = config_lines(args.paths + [os.path.dirname(tcl_path)])
+        for name, split in (("pyparsing", pyparsing_split),
+                            ("fast", convert.split_tcl_line)):
+            best = min(timeit.repeat(
+                lambda: [split("{" + line + "}") for line in lines],
+                number=1, repeat=args.repeat))
+            print("%-10s split %7d lines  %8.3f s %10.0f lines/s"
+                  % (name, len(lines), best, len(lines) / best))
+
+        out_dir = os.path.join(work_dir, "json")
+        os.makedirs(out_dir)
+        for tokenizer in ("pyparsing", "fast"):
+            best = min(timeit.repeat(
+                lambda: convert_tree(tcl_path, out_dir, tokenizer),
+                number=1, repeat=args.repeat))
+            print("%-10s convert %5s tree       %8.3f s %10.0f lines/s"
+                  % (tokenizer, args.size, best, len(lines) / best))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,27 @@
+# Generate synthetic configurations for benchmarks.
+#
+# Menu trees (JSON) and TCL configurations for convert.py are written by
+# pylauncher.launcher_bench. Both have the same shape: each menu has a
+# title, items command items, a separator and (up to depth levels) width
+# submenus.
+
+from _pylauncher import pylauncher_module
+
+launcher_bench = pylauncher_module("launcher_bench")
+
+# Tree sizes used by the benchmarks: (depth, width, items)
+TREE_SIZES = {
+    "small": (2, 4, 50),      # 21 files, ~1 100 items
+    "medium": (3, 5, 100),    # 156 files, ~16 000 items
+    "large": (3, 8, 150),     # 585 files, ~90 000 items
+}
+
+
+def generate_menu_tree(out_dir, size):
+    """Write JSON menu tree of given size. Returns path of the root menu."""
+    return launcher_bench.generate_menu_tree(out_dir, *TREE_SIZES[size])
+
+
+def generate_tcl_tree(out_dir, size):
+    """Write TCL menu tree of given size. Returns path of the root file."""
+    return launcher_bench.generate_tcl_tree(out_dir, *TREE_SIZES[size])
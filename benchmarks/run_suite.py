@@ -0,0 +1,462 @@
+#!/usr/bin/env python
+#
+# Benchmark suite of the launcher.
+#
+# Measures on generated menu trees of growing size (see generate.py):
+#
+#     model_load      loading the menu model (no GUI)
+#     window          LauncherWindow construction and root menu build
+#     filter          LauncherMenu.filterMenu per keystroke of a filter term
+#     search_view     opening LauncherSearchMenuView
+#     style           composing (LauncherStyle) and applying style sheets
+#     convert         convert.py throughput on TCL configurations
+#     launch          click to pid latency of process_manager.launch, with
+#                     the launcher forking and with the spawner helper
+#                     (does not depend on the tree size)
+#
+# Qt benchmarks run headless: QT_QPA_PLATFORM=offscreen is set for Qt
+# builds with platform plugins, and for Qt 4 on X11 an Xvfb server is
+# started if DISPLAY is not set (or run the suite with xvfb-run -a). If
+# PyQt or a display is not available, Qt benchmarks are skipped.
+#
+# Results are printed and can be stored as JSON (--output). --compare
+# compares this run (or a second result file) with stored results and
+# exits with 1 if any benchmark got slower by more than --tolerance.
+#
+# Usage: python benchmarks/run_suite.py [--sizes small,medium,large]
+#            [--only NAME,...] [-r REPEAT] [--output FILE]
+#            [--compare BASELINE [RESULTS]] [--tolerance PERCENT]
+
+from __future__ import print_function
+from __future__ import division
+
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import logging
+import platform
+import argparse
+import tempfile
+import subprocess
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _pylauncher import pylauncher_module
+from generate import TREE_SIZES, generate_menu_tree, generate_tcl_tree
+
+launcher_model = pylauncher_module("launcher_model")
+launcher_bench = pylauncher_module("launcher_bench")
+
+REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        os.pardir)
+# Example mapping has themes (examples/themes) used by generated items.
+MAPPING_PATH = os.path.join(REPO_DIR, "examples", "mapping", "mapping.json")
+FILTER_TERM = "panel 0_1 7"
+
+
+def measure(function, repeat, setup=None):
+    """Run function repeat times. Returns best and median time (seconds).
+
+    setup (if given) is called before each run and its result passed to
+    function; its time is not measured.
+    """
+    times = list()
+    for i in range(repeat):
+        args = (setup(),) if setup else ()
+        start = time.perf_counter()
+        function(*args)
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return {"seconds": times[0], "median": times[len(times) // 2]}
+
+
+def load_mapping():
+    with open(MAPPING_PATH) as mapping_file:
+        cfg = json.load(mapping_file)
+    cfg["cfg_base"] = os.path.dirname(MAPPING_PATH)
+    return cfg
+
+
+class qt_environment(object):
+
+    """PyQt application for Qt benchmarks, started on first use."""
+
+    def __init__(self):
+        self.app = None
+        self.launcher = None
+        self.xvfb = None
+        self.error = None
+
+    def start(self):
+        if self.app or self.error:
+            return self.app
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        try:
+            from PyQt4 import QtGui
+        except ImportError as e:
+            self.error = "PyQt4 not available ({})".format(e)
+            return None
+        if sys.platform.startswith("linux") and \
+                not os.environ.get("DISPLAY"):
+            self.start_xvfb()
+            if self.error:
+                return None
+
+        self.launcher = pylauncher_module("launcher")
+        self.app = QtGui.QApplication(["pylauncher-benchmarks"])
+        return self.app
+
+    def start_xvfb(self):
+        """Start Xvfb on a free display (Qt 4 needs an X server)."""
+        read_fd, write_fd = os.pipe()
+        try:
+            self.xvfb = subprocess.Popen(
+                ["Xvfb", "-displayfd", str(write_fd), "-screen", "0",
+                 "1280x1024x24", "-nolisten", "tcp"],
+                pass_fds=(write_fd,), stderr=subprocess.DEVNULL)
+        except OSError as e:
+            self.error = "no DISPLAY and Xvfb not available ({})".format(e)
+            return
+        finally:
+            os.close(write_fd)
+        with os.fdopen(read_fd) as display_pipe:
+            display = display_pipe.readline().strip()
+        if not display:
+            self.error = "Xvfb could not be started"
+            return
+        os.environ["DISPLAY"] = ":" + display
+
+    def process_events(self):
+        self.app.processEvents()
+
+    def stop(self):
+        if self.xvfb:
+            self.xvfb.terminate()
+            self.xvfb.wait()
+
+
+def bench_model_load(context, size, repeat):
+    root_path = context.menu_tree(size)
+    launcher_cfg = launcher_bench.load_mapping(MAPPING_PATH)
+    result = measure(lambda: launcher_bench.load_menu_tree(root_path,
+                                                           launcher_cfg),
+                     repeat)
+    model, stats, total_time = launcher_bench.load_menu_tree(root_path,
+                                                             launcher_cfg)
+    result["items"] = model.loaded_item_count()
+    result["items_per_second"] = result["items"] / result["seconds"]
+    return result
+
+
+def new_window(context, size):
+    launcher = context.qt.launcher
+    return launcher.LauncherWindow(context.menu_tree(size), load_mapping())
+
+
+def close_window(context, window):
+    window.close()
+    window.deleteLater()
+    context.qt.process_events()
+
+
+def bench_window(context, size, repeat):
+    def build():
+        window = new_window(context, size)
+        window.launcherMenu.ensureMenuBuilt()
+        close_window(context, window)
+
+    return measure(build, repeat)
+
+
+def bench_filter(context, size, repeat):
+    """Filter root menu with each prefix of FILTER_TERM (as if typed).
+
+    First keystroke builds the widgets of matching submenus, so it is
+    reported separately from the following ones.
+    """
+    first = list()
+    following = list()
+    for i in range(repeat):
+        window = new_window(context, size)
+        menu = window.launcherMenu
+        menu.ensureMenuBuilt()
+        for length in range(1, len(FILTER_TERM) + 1):
+            start = time.perf_counter()
+            menu.filterMenu(FILTER_TERM[:length])
+            duration = time.perf_counter() - start
+            (following if length > 1 else first).append(duration)
+        close_window(context, window)
+
+    following.sort()
+    return {"seconds": sum(following) / len(following),
+            "median": following[len(following) // 2],
+            "max": following[-1],
+            "first_keystroke": min(first)}
+
+
+def bench_search_view(context, size, repeat):
+    launcher = context.qt.launcher
+    window = new_window(context, size)
+
+    def open_view():
+        view = launcher.LauncherSearchMenuView(window.menuModel,
+                                               window.mainButton,
+                                               window.launcherMenu)
+        view.exposeMenu("")
+        context.qt.process_events()
+        return view
+
+    try:
+        open_view().deleteLater()  # Search index is built once per model.
+        context.qt.process_events()
+        result = measure(lambda: open_view().deleteLater(), repeat)
+        start = time.perf_counter()
+        view = open_view()
+        view.filterMenu(FILTER_TERM)
+        result["filter"] = time.perf_counter() - start - result["seconds"]
+        view.deleteLater()
+    finally:
+        close_window(context, window)
+    return result
+
+
+def bench_style(context, size, repeat):
+    """Compose and apply style sheets to command buttons of the tree."""
+    launcher = context.qt.launcher
+    window = new_window(context, size)
+    items = list()
+    menus = [window.menuModel]
+    while menus:
+        for item in menus.pop().menu_items:
+            if isinstance(item, launcher_model.launcher_cmd_item):
+                items.append(item)
+            elif isinstance(item, launcher_model.launcher_sub_menu_item):
+                menus.append(item.sub_menu)
+    menu = window.launcherMenu
+
+    def compose():
+        for item in items:
+            launcher.LauncherStyle(menu, item.theme, item.style)
+
+    def apply_styles():
+        buttons = [launcher.LauncherCmdButton(item, None, menu)
+                   for item in items[:2000]]
+        for button in buttons:
+            button.deleteLater()
+        context.qt.process_events()
+
+    try:
+        result = measure(compose, repeat)
+        result["items"] = len(items)
+        result["apply_2000_buttons"] = measure(apply_styles,
+                                               repeat)["seconds"]
+    finally:
+        close_window(context, window)
+    return result
+
+
+def bench_convert(context, size, repeat):
+    convert = pylauncher_module("convert.convert")
+    tcl_path = context.tcl_tree(size)
+    out_dir = tempfile.mkdtemp(dir=context.work_dir)
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            parser = convert.LauncherMenuModelParser(tcl_path, out_dir, True)
+            parser.parse()
+            parser.to_json()
+
+    result = measure(run, repeat)
+    lines = 0
+    files = 0
+    for file_name in os.listdir(os.path.dirname(tcl_path)):
+        with open(os.path.join(os.path.dirname(tcl_path), file_name)) as f:
+            lines += sum(1 for line in f)
+        files += 1
+    result["files"] = files
+    result["lines_per_second"] = lines / result["seconds"]
+    return result
+
+
+def bench_launch(context, size, repeat):
+    """Time from launch request to known pid of a started command.
+
+    Each command is started after the previous one exited. Commands are
+    started directly (fork of this process) and, on posix, with the
+    spawner helper.
+    """
+    launcher_process = pylauncher_module("launcher_process")
+    cmd = "true"
+    argv = [sys.executable, "-S", "-c", "pass"]
+    launches = repeat * 10  # Single launches are short and noisy.
+
+    def measure_launch(manager):
+        def wait_exited():
+            manager.reap()
+            while manager.running:
+                time.sleep(0.001)
+                manager.reap()
+
+        try:
+            return measure(lambda *args: manager.launch(cmd, argv),
+                           launches, setup=wait_exited)
+        finally:
+            wait_exited()
+            manager.close()
+
+    result = measure_launch(
+        launcher_process.launcher_process_manager(min_interval=0))
+    if os.name == "posix":
+        manager = launcher_process.launcher_process_manager(min_interval=0)
+        manager.start_spawner()
+        spawner = measure_launch(manager)
+        result["spawner"] = spawner["seconds"]
+        result["spawner_median"] = spawner["median"]
+    return result
+
+
+BENCHMARKS = [
+    ("model_load", bench_model_load, False),
+    ("window", bench_window, True),
+    ("filter", bench_filter, True),
+    ("search_view", bench_search_view, True),
+    ("style", bench_style, True),
+    ("convert", bench_convert, False),
+    ("launch", bench_launch, False),
+]
+
+
+class suite_context(object):
+
+    """Generated configurations (shared by benchmarks) and Qt."""
+
+    def __init__(self, work_dir):
+        self.work_dir = work_dir
+        self.qt = qt_environment()
+        self.trees = dict()
+
+    def menu_tree(self, size):
+        key = ("json", size)
+        if key not in self.trees:
+            self.trees[key] = generate_menu_tree(
+                os.path.join(self.work_dir, "json_" + size), size)
+        return self.trees[key]
+
+    def tcl_tree(self, size):
+        key = ("tcl", size)
+        if key not in self.trees:
+            self.trees[key] = generate_tcl_tree(
+                os.path.join(self.work_dir, "tcl_" + size), size)
+        return self.trees[key]
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "describe", "--always", "--dirty"], cwd=REPO_DIR,
+            stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(names, sizes, repeat):
+    results = {"meta": {"revision": git_revision(),
+                        "python": platform.python_version(),
+                        "platform": platform.platform(),
+                        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                        "repeat": repeat},
+               "results": dict(),
+               "skipped": dict()}
+
+    work_dir = tempfile.mkdtemp(prefix="pylauncher-benchmarks-")
+    context = suite_context(work_dir)
+    try:
+        for name, bench, needs_qt in BENCHMARKS:
+            if name not in names:
+                continue
+            if needs_qt and not context.qt.start():
+                results["skipped"][name] = context.qt.error
+                print("%-24s skipped: %s" % (name, context.qt.error))
+                continue
+            for size in sizes:
+                key = "%s[%s]" % (name, size)
+                result = bench(context, size, repeat)
+                results["results"][key] = result
+                print("%-24s %10.2f ms" % (key, result["seconds"] * 1000))
+    finally:
+        context.qt.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+
+def compare(baseline, results, tolerance):
+    """Print change of each benchmark. Returns list of regressions."""
+    regressions = list()
+    print("")
+    print("%-24s %12s %12s %8s" % ("benchmark", "baseline ms", "ms",
+                                    "change"))
+    for key in sorted(results["results"]):
+        if key not in baseline["results"]:
+            continue
+        old = baseline["results"][key]["seconds"]
+        new = results["results"][key]["seconds"]
+        change = (new - old) / old * 100
+        mark = ""
+        if change > tolerance:
+            mark = "  REGRESSION"
+            regressions.append(key)
+        print("%-24s %12.2f %12.2f %+7.1f%%%s" % (key, old * 1000,
+                                                  new * 1000, change, mark))
+    return regressions
+
+
+def main():
+    args_pars = argparse.ArgumentParser(
+        description="Run launcher benchmarks and compare results.")
+    args_pars.add_argument('--sizes', default="small,medium",
+                           help="tree sizes (%s, default: small,medium)"
+                                % ",".join(sorted(TREE_SIZES)))
+    args_pars.add_argument('--only',
+                           help="run only these benchmarks (%s)"
+                                % ",".join(name for name, b, q in BENCHMARKS))
+    args_pars.add_argument('-r', '--repeat', type=int, default=3)
+    args_pars.add_argument('-o', '--output',
+                           help="store results as JSON to OUTPUT")
+    args_pars.add_argument('--compare', nargs='+',
+                           metavar=('BASELINE', 'RESULTS'),
+                           help="compare with BASELINE results (RESULTS "
+                                "instead of running the suite)")
+    args_pars.add_argument('--tolerance', type=float, default=10,
+                           help="allowed slowdown in percent (default: 10)")
+    args = args_pars.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    if args.compare and len(args.compare) > 2:
+        args_pars.error("--compare takes BASELINE and optional RESULTS")
+
+    if args.compare and len(args.compare) == 2:
+        with open(args.compare[1]) as results_file:
+            results = json.load(results_file)
+    else:
+        names = [name for name, bench, needs_qt in BENCHMARKS]
+        if args.only:
+            names = args.only.split(",")
+        results = run_suite(names, args.sizes.split(","),
+                            max(args.repeat, 1))
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare[0]) as baseline_file:
+            baseline = json.load(baseline_file)
+        if compare(baseline, results, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
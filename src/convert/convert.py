@@ -3,10 +3,167 @@
 from __future__ import print_function
 import sys
 import os
+import re
 import json
+import stat
 import codecs
+import hashlib
 import argparse
-import pyparsing
+import collections
+import multiprocessing
+
+
+# Tokens of a TCL configuration line: white space, brace, quote and run of
+# other characters.
+tcl_token = re.compile(r'''[ \t\n\r]+|([{}])|(["'])|([^{} \t\n\r"']+)''')
+
+# Quoted strings (as pyparsing.quotedString) without the closing quote.
+tcl_quoted = {
+    '"': re.compile(r'"(?:[^"\n\r\\]|(?:"")|(?:\\(?:[^x]|x[0-9a-fA-F]+)))*'),
+    "'": re.compile(r"'(?:[^'\n\r\\]|(?:'')|(?:\\(?:[^x]|x[0-9a-fA-F]+)))*"),
+}
+
+
+def split_tcl_line(line):
+    """Splits a line enclosed in curly braces into nested lists of words.
+
+    Gives the same result as pyparsing.nestedExpr('{', '}') (parseString
+    and asList) in a single pass over the line. Words are separated by
+    white space and braces. Quoted strings ("..." or '...', doubled quotes
+    inside are escapes) are kept as single words, quotes included. Text
+    after the brace which closes the line is ignored. Raises ValueError if
+    the line is not closed.
+    """
+    # Like pyparsing, tabs are expanded first.
+    line = line.expandtabs()
+    groups = list()
+    pos = 0
+    word_end = -1
+
+    while True:
+        match = tcl_token.match(line, pos)
+        if match is None:
+            raise ValueError('Missing closing brace')
+        brace, quote, word = match.groups()
+        start = pos
+        pos = match.end()
+
+        if brace == '{':
+            group = list()
+            if groups:
+                groups[-1].append(group)
+            groups.append(group)
+            continue
+        elif brace == '}':
+            group = groups.pop()
+            if not groups:
+                return group
+            continue
+        elif not groups:
+            if brace or quote or word:
+                raise ValueError('Line must start with a brace')
+            continue
+
+        if quote:
+            quoted_end = tcl_quoted[quote].match(line, start).end()
+            if line.startswith(quote, quoted_end):
+                groups[-1].append(line[start:quoted_end + 1])
+                pos = quoted_end + 1
+                continue
+            word = quote  # Not closed. Part of a word.
+
+        if word:
+            # Characters not separated by white space, brace or quoted
+            # string are one word.
+            if word_end == start:
+                groups[-1][-1] += word
+            else:
+                groups[-1].append(word)
+            word_end = pos
+
+
+def read_tcl_lines(path):
+    """Reads logical lines of a TCL configuration file.
+
+    Yields line number, line and True if the line is a comment. Lines
+    split with \\ characters are joined. Empty lines are skipped.
+    """
+    with codecs.open(path, encoding='ISO-8859-1') as tickle_file:
+        for logical_line in join_tcl_lines(tickle_file):
+            yield logical_line
+
+
+def join_tcl_lines(lines):
+    """Joins lines of a TCL configuration (see read_tcl_lines)."""
+    parts = list()
+    line_number = 0
+
+    for line in lines:
+        line = line.lstrip()
+        line = line.rstrip('\n')
+
+        line_number += 1
+
+        # Skip over empty lines
+        if not line:
+            continue
+
+        # Tickle has the option of multi-line-split
+        # configuration lines using \ character
+        if '\\' in line:
+            # Remove '\' character and newlines
+            parts.append(line.translate(LauncherMenuModel.translate_table))
+        else:
+            parts.append(line)
+            yield line_number, ''.join(parts), line[0] == '#'
+            parts = list()
+
+
+def file_hash(path):
+    """Returns SHA-1 of the file content, None if it cannot be read."""
+    try:
+        with open(path, 'rb') as hashed_file:
+            return hashlib.sha1(hashed_file.read()).hexdigest()
+    except (IOError, OSError):
+        return None
+
+
+def write_file(path, data):
+    """Writes data (bytes) to a temporary file and renames it to path.
+
+    Readers of the file never see a partly written file. An existing file
+    keeps its permissions, a new one is created according to the umask.
+    """
+    tmp_path = path + '.' + str(os.getpid())
+    with open(tmp_path, 'wb') as output_file:
+        output_file.write(data)
+    try:
+        os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+    except OSError:
+        pass  # New file
+    if os.name == 'nt' and os.path.exists(path):
+        os.remove(path)
+    os.rename(tmp_path, path)
+
+
+def ask_overwrite():
+    """Asks user if existing output file should be overwritten."""
+    try:
+        read_input = raw_input
+    except NameError:
+        read_input = input
+
+    while True:
+        try:
+            user_input = read_input('Overwrite? [y/N]:')
+        except EOFError:
+            return False
+        if user_input == 'y' or user_input == 'Y':
+            return True
+        elif (user_input == 'n' or
+              user_input == 'N' or
+              not user_input):
+            return False
 
 
 class LauncherMenuModel(object):
@@ -19,21 +176,34 @@ class LauncherMenuModel(object):
     configuration file. During parsing a list of files is compiled of
     all the menu configuration files that this file depends on. This
     list is used for recursive parsing.
+
+    Lines are split with split_tcl_line, or with pyparsing if tokenizer is
+    'pyparsing' (the previous implementation, kept for comparison).
+
+    Menus and file choices reference files with extension (.json for
+    converted files). If lines (text of the file) are given, the file is
+    not read and referenced files are not checked; this is how the
+    launcher loads TCL configurations without converting them. Messages
+    are output with report().
     """
 
-    # Parser to split the TCL configuration
-    # lines into an list of parameters
-    expr_split = pyparsing.nestedExpr('{', '}')
+    # Parser to split the TCL configuration lines into an list of
+    # parameters (pyparsing tokenizer). Created when first needed.
+    expr_split = None
 
     # Translation table for character replacement
     translate_table = dict((ord(char), u'') for char in u'\\\n')
 
-    def __init__(self, dir_path, file_path, force):
+    def __init__(self, dir_path, file_path, force, tokenizer='fast',
+                 extension='.json', lines=None):
         self.dir_path = dir_path
         self.file_path = file_path
         self.path = os.path.join(self.dir_path, self.file_path)
 
         self.force = force
+        self.tokenizer = tokenizer
+        self.extension = extension
+        self.lines = lines
 
         self.title = None
         self.file_choice = None
@@ -41,47 +211,45 @@ class LauncherMenuModel(object):
         self.menu_items = list()
         self.json_config = dict()
         self.file_list = list()
+        # Referenced files that did not exist (skipped with force)
+        self.missing_files = list()
 
         self.line_number = 0
         self.parse()
 
+    def report(self, message):
+        print(message)
+
     def parse(self):
         """Entry method to parse the tickle configuration file.
 
         Opens the tickle file and reads it line by line. Each line is
         parsed separately by the parse_line method.
         """
-        with codecs.open(self.path, encoding='ISO-8859-1') as tickle_file:
-            parse_line = ''
-
-            for line in tickle_file:
-                line = line.lstrip()
-                line = line.rstrip('\n')
-
-                # Track the current line number for logging output
-                self.line_number += 1
-
-                # Skip over empty lines
-                if not line:
-                    continue
-
-                # Tickle has the option of multi-line-split
-                # configuration lines using \ character
-                if '\\' in line:
-                    # Remove '\' character and newlines
-                    line = line.translate(LauncherMenuModel.translate_table)
-                    parse_line += line
-                else:
-                    parse_line += line
-                    # Skip over comment lines
-                    if line[0] != '#':
-                        try:
-                            self.parse_line(parse_line)
-                        except:
-                            print("ERR: Following line can not be parsed:")
-                            print(parse_line)
-                            sys.exit(-1)
-                    parse_line = ''
+        if self.lines is None:
+            tcl_lines = read_tcl_lines(self.path)
+        else:
+            tcl_lines = join_tcl_lines(self.lines)
+
+        for line_number, parse_line, comment in tcl_lines:
+            # Track the current line number for logging output
+            self.line_number = line_number
+
+            # Skip over comment lines
+            if not comment:
+                try:
+                    self.parse_line(parse_line)
+                except:
+                    self.report("ERR: Following line can not be parsed:")
+                    self.report(parse_line)
+                    sys.exit(-1)
+
+    @staticmethod
+    def pyparsing_split_line(line):
+        if LauncherMenuModel.expr_split is None:
+            import pyparsing
+            LauncherMenuModel.expr_split = pyparsing.nestedExpr('{', '}')
+        return LauncherMenuModel.expr_split.parseString(line).asList()[0]
 
     def parse_line(self, line):
         """Parses each line and converts it into objects.
@@ -96,7 +264,10 @@ class LauncherMenuModel(object):
         # the line.
         line = '{' + line + '}'
 
-        items = LauncherMenuModel.expr_split.parseString(line).asList()[0]
+        if self.tokenizer == 'pyparsing':
+            items = LauncherMenuModel.pyparsing_split_line(line)
+        else:
+            items = split_tcl_line(line)
 
         # Split parsed list into 2 lists depending on
         # function of the parameters inside
@@ -117,20 +288,20 @@ class LauncherMenuModel(object):
             self.json_config['menu-title']['text'] = params[0]
 
             if len(params) > 0:
-                print(('Inf: Skipping additional parameters in '
-                       'file "%s", line line %d') \
+                self.report(('Inf: Skipping additional parameters in '
+                             'file "%s", line line %d') \
                     % (self.file_path, self.line_number))
 
         # Add the file choice element to the configuration list
         elif command[0] == '@FileChoice':
             file_choice = list()
             file_choice.append(dict([('text', params[0]),
-                                    ('file', command[1]+'.json')]))
+                                    ('file', command[1]+self.extension)]))
             self.json_config['file-choice'] = file_choice
 
             if len(params) > 1:
-                print(('Inf: Skipping additional parameters in '
-                       'file "%s", line line %d') \
+                self.report(('Inf: Skipping additional parameters in '
+                             'file "%s", line line %d') \
                     % (self.file_path, self.line_number))
 
         # The command dictates that a separator is added
@@ -138,8 +309,8 @@ class LauncherMenuModel(object):
             element['type'] = 'separator'
 
             if len(params) > 0:
-                print(('Inf: Skipping additional parameters in '
-                       'file "%s", line line %d') \
+                self.report(('Inf: Skipping additional parameters in '
+                             'file "%s", line line %d') \
                     % (self.file_path, self.line_number))
 
         # The commands translates into the title element
@@ -148,8 +319,8 @@ class LauncherMenuModel(object):
             element['text'] = params[0]
 
             if len(params) > 1:
-                print(('Inf: Skipping additional parameters in '
-                       'file "%s", line line %d') \
+                self.report(('Inf: Skipping additional parameters in '
+                             'file "%s", line line %d') \
                     % (self.file_path, self.line_number))
 
         # The command loads a new menu from another file
@@ -157,22 +328,23 @@ class LauncherMenuModel(object):
             filepath = os.path.join(self.dir_path, command[1] + '.config')
 
             # Don't add the menu if the file does not exist
-            if not os.path.isfile(filepath):
+            if self.lines is None and not os.path.isfile(filepath):
                 if self.force:
-                    print('Wrn: File "%s" does not exist. Skipping...' % \
-                        filepath)
+                    self.report('Wrn: File "%s" does not exist. Skipping...' \
+                        % filepath)
+                    self.missing_files.append(command[1] + '.config')
                     return
                 else:
-                    print('Err: File "%s" does not exist.' % filepath)
+                    self.report('Err: File "%s" does not exist.' % filepath)
                     sys.exit(-1)
 
             element['type'] = 'menu'
             element['text'] = params[0]
-            element['file'] = command[1] + '.json'
+            element['file'] = command[1] + self.extension
 
             if len(params) > 1:
-                print(('Inf: Skipping additional parameters in '
-                       'file "%s", line line %d') \
+                self.report(('Inf: Skipping additional parameters in '
+                             'file "%s", line line %d') \
                     % (self.file_path, self.line_number))
 
             # Track all additional files that need to be parsed
@@ -180,7 +352,7 @@ class LauncherMenuModel(object):
 
         # Skip over lines where the command starts with a hash (comment)
         elif command[0].startswith('#'):
-            print('Inf: Skipping line %d in file "%s" - comment' \
+            self.report('Inf: Skipping line %d in file "%s" - comment' \
                 % (self.line_number, self.file_path))
 
         # If nothing else this is a command
@@ -245,50 +417,61 @@ class LauncherMenuModel(object):
         else:
             return ' '.join(new_item_list)
 
-    def to_json(self, out_path, overwrite=False):
+    def to_json(self, out_path, overwrite=False, on_existing=None,
+                own_output=None):
         """Mehod to output internal data into the JSON file.
 
         This method outputs the parsed configuration data into the JSON
-        file. If the file already exists the user is asked if it should
-        be overwritten or not. The overwrite flag parameter specifies
-        if the files should be overwritten without asking the user.
+        file. The file is written (through a temporary file) only if its
+        content changes. If a different file already exists, on_existing
+        decides: 'prompt' asks the user, 'skip' keeps the existing file and
+        'overwrite' replaces it. Without on_existing the overwrite flag
+        parameter specifies if the files should be overwritten without
+        asking the user. An existing file with hash own_output (written by
+        the previous run) is replaced without asking.
+
+        Returns hash of the output file content, None if it was not
+        written.
         """
+        if not on_existing:
+            on_existing = 'overwrite' if overwrite else 'prompt'
+
         split = os.path.splitext(self.file_path)
         if not split[1]:
             print('Err: Unable to parse extension from file name: %s' \
                 % self.file_path)
-            return
+            return None
 
         out_file = os.path.join(out_path, split[0] + '.json')
-        print('Inf: Writing file: %s' % out_file)
 
         if os.path.isdir(out_file):
             print('Err: Output file "%s" is a directory!' % out_file)
-            return
-
-        if os.path.isfile(out_file):
-            if not overwrite:
-                print('Wrn: Output file "%s" already exists!' \
-                    % out_file)
-
-                user_input = ''
-                while True:
-                    user_input = raw_input('Overwrite? [y/N]:')
-                    if user_input == 'y' or user_input == 'Y':
-                        break
-                    elif (user_input == 'n' or
-                          user_input == 'N' or
-                          not user_input):
-                        return
+            return None
 
         # Set the item list to the menu key in the top dictionary
         self.json_config['menu'] = self.menu_items
 
-        with codecs.open(out_file, mode='w', encoding='utf-8') \
-                as output_file:
+        data = json.dumps(self.json_config, indent=4).encode('utf-8')
+        data_hash = hashlib.sha1(data).hexdigest()
+        existing_hash = file_hash(out_file)
+        if existing_hash == data_hash:
+            print('Inf: Output file "%s" is up to date' % out_file)
+            return data_hash
 
-            json.dump(self.json_config, output_file, indent=4)
-            output_file.close()
+        if existing_hash is not None and existing_hash != own_output:
+            if on_existing == 'skip':
+                print('Wrn: Output file "%s" already exists! Skipping...' \
+                    % out_file)
+                return None
+            elif on_existing == 'prompt':
+                print('Wrn: Output file "%s" already exists!' \
+                    % out_file)
+                if not ask_overwrite():
+                    return None
+
+        print('Inf: Writing file: %s' % out_file)
+        write_file(out_file, data)
+        return data_hash
 
     def get_file_list(self):
         """Method to get the list of menu files that this menu
@@ -296,16 +479,56 @@ class LauncherMenuModel(object):
         return self.file_list
 
 
+class PrintedOutput(list):
+
+    """Collects text printed while a file is parsed in a worker."""
+
+    write = list.append
+
+    def flush(self):
+        pass
+
+
+def parse_menu_file(dir_path, file_path, force, tokenizer='fast'):
+    """Parse a single menu file. Runs in a worker process.
+
+    Returns the parsed model (None if parsing stopped the program), the
+    text printed while parsing and the exit code (None if not stopped).
+    Printed text is returned so it can be output in the same order as when
+    files are parsed one after another.
+    """
+    stdout = sys.stdout
+    sys.stdout = output = PrintedOutput()
+    try:
+        return LauncherMenuModel(dir_path, file_path, force, tokenizer), \
+            ''.join(output), None
+    except SystemExit as e:
+        return None, ''.join(output), e.code
+    finally:
+        sys.stdout = stdout
+
+
 class LauncherMenuModelParser(object):
 
     """Class for recursive module configuration parsing
 
     Holds information about the files that have been already parsed and
-    those who still need to be. After each new menu file is parsed the
-    list of files is extended with the menu's dependencies.
+    those who still need to be. Files that still need to be parsed are kept
+    in a queue. After each new menu file is parsed its dependencies which
+    were not seen yet are added to the queue.
+
+    If incremental is True, a manifest in the output folder holds for each
+    converted file the hash of its content, its dependencies, referenced
+    files that did not exist and the hash of the written output. A file
+    is parsed and written again only if any of them changed, otherwise its
+    dependencies are taken from the manifest.
     """
 
-    def __init__(self, input_file, output_path, overwrite=False):
+    manifest_name = '.convert-manifest.json'
+    manifest_version = 1
+
+    def __init__(self, input_file, output_path, overwrite=False,
+                 on_existing=None, incremental=False):
 
         # Split path into filename and directory path
         input_file_split = os.path.split(input_file)
@@ -313,69 +536,185 @@ class LauncherMenuModelParser(object):
         self.input_file_path = input_file_split[0]
         self.output_path = output_path
         self.overwrite = overwrite
+        self.on_existing = on_existing
+        self.incremental = incremental
 
-        self.input_files = dict()
+        # Files in the order they were found (file name: parsed model,
+        # None if not parsed)
+        self.input_files = collections.OrderedDict()
 
         # Add the first input file to the dictionary
         self.input_files[input_file_split[1]] = None
 
+        self.options = {'version': self.manifest_version,
+                        'input': os.path.abspath(self.input_file_path)}
+        self.manifest = dict()  # file name: entry of previous run
+        self.entries = dict()  # file name: entry of this run
+        self.hashes = dict()  # file name: hash of parsed file
+        if incremental:
+            self.read_manifest()
+
     # Parse requested files
-    def parse(self, single=False, force=True):
+    def parse(self, single=False, force=True, jobs=1, tokenizer='fast'):
         """Method for recursive file parsing and tracking files.
 
         This method starts by parsing the configuration file that the user
         provided and continues to parse its dependent files if recursive
-        parsing is enabled (it is by default).
+        parsing is enabled (it is by default). With jobs > 1 files are
+        parsed in that many worker processes. Files are still added and
+        reported in the same order as when parsed one after another.
+        tokenizer is passed to LauncherMenuModel.
         """
-        finished = False
-
-        while not finished:
-
-            input_name = None
-
-            # Check if we parsed all files and get the next
-            # in line to be parsed
-            for key, value in self.input_files.items():
-                if not value:
-                    input_name = key
-                    break
+        if self.options.get('force', force) != force:
+            self.manifest = dict()  # Converted with other options.
+        self.options['force'] = force
+        queue = collections.deque(self.input_files.keys())
 
-            # If we parsed all of them, stop
-            if not input_name:
-                finished = True
-                print('Inf: Successfully finished parsing!')
-                continue
-
-            # Parse the current file
-            menu_model = LauncherMenuModel(self.input_file_path,
-                                           input_name,
-                                           force)
+        if jobs > 1 and not single:
+            self.parse_parallel(queue, force, jobs, tokenizer)
+        else:
+            while queue:
+                input_name = queue.popleft()
+
+                # Parse the current file (if it changed) and store the
+                # parsed model
+                file_list = self.unchanged_file_list(input_name)
+                if file_list is None:
+                    menu_model = LauncherMenuModel(self.input_file_path,
+                                                   input_name,
+                                                   force,
+                                                   tokenizer)
+                    self.input_files[input_name] = menu_model
+                    file_list = menu_model.get_file_list()
+
+                # If we do not want to parse any additional files, stop
+                if(single):
+                    return
 
-            # Store the file parsed model
-            self.input_files[input_name] = menu_model
+                self.add_files(file_list, queue)
 
-            # If we do not want to parse any additional files, stop
-            if(single):
-                break
+        print('Inf: Successfully finished parsing!')
 
-            # Get list of all depending files that have been
-            # detected during parsing of the configuration
-            file_list = menu_model.get_file_list()
+    def parse_parallel(self, queue, force, jobs, tokenizer='fast'):
+        """Parse files from the queue in a pool of worker processes.
 
-            # Add any files not yet present in the dictionary to it
-            for input_file in file_list:
-                if input_file not in self.input_files.keys():
-                    self.input_files[input_file] = None
+        Files are sent to the workers as soon as they are found. Results
+        are taken in the same order, so dependencies are found in the same
+        order as when files are parsed one after another.
+        """
+        pool = multiprocessing.Pool(jobs)
+        pending = collections.deque()
+        try:
+            while queue or pending:
+                while queue:
+                    input_name = queue.popleft()
+                    file_list = self.unchanged_file_list(input_name)
+                    result = None
+                    if file_list is None:
+                        result = pool.apply_async(
+                            parse_menu_file,
+                            (self.input_file_path, input_name, force,
+                             tokenizer))
+                    pending.append((input_name, file_list, result))
+
+                input_name, file_list, result = pending.popleft()
+                if result is not None:
+                    menu_model, output, exit_code = result.get()
+                    sys.stdout.write(output)
+                    if menu_model is None:
+                        sys.exit(exit_code)
+
+                    self.input_files[input_name] = menu_model
+                    file_list = menu_model.get_file_list()
+                self.add_files(file_list, queue)
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def add_files(self, file_list, queue):
+        """Add files that were not seen yet to the queue."""
+        for input_file in file_list:
+            if input_file not in self.input_files:
+                self.input_files[input_file] = None
+                queue.append(input_file)
+
+    def unchanged_file_list(self, input_name):
+        """Returns dependencies of the file if it must not be parsed.
+
+        Returns None if the file must be parsed: not incremental, file not
+        in the manifest, or its content, existence of referenced files or
+        its output changed since.
+        """
+        if not self.incremental:
+            return None
+
+        path = os.path.join(self.input_file_path, input_name)
+        self.hashes[input_name] = file_hash(path)
+        entry = self.manifest.get(input_name)
+        if not entry or entry['hash'] != self.hashes[input_name]:
+            return None
+        for file_name in entry['files']:
+            if not os.path.isfile(os.path.join(self.input_file_path,
+                                               file_name)):
+                return None
+        for file_name in entry['missing']:
+            if os.path.isfile(os.path.join(self.input_file_path, file_name)):
+                return None
+        out_file = os.path.join(self.output_path,
+                                os.path.splitext(input_name)[0] + '.json')
+        if file_hash(out_file) != entry['output']:
+            return None
+
+        self.entries[input_name] = entry
+        return entry['files']
+
+    def read_manifest(self):
+        path = os.path.join(self.output_path, self.manifest_name)
+        try:
+            with codecs.open(path, encoding='utf-8') as manifest_file:
+                manifest = json.load(manifest_file)
+        except (IOError, ValueError):
+            return  # No manifest (yet). All files are converted.
+
+        options = manifest.get('options', dict())
+        if options.get('version') == self.options['version'] and \
+                options.get('input') == self.options['input']:
+            self.options = options
+            self.manifest = manifest.get('files', dict())
+
+    def write_manifest(self):
+        files = dict(self.manifest)
+        files.update(self.entries)
+        manifest = {'options': self.options, 'files': files}
+        data = json.dumps(manifest, indent=1, sort_keys=True).encode('utf-8')
+        path = os.path.join(self.output_path, self.manifest_name)
+        if file_hash(path) != hashlib.sha1(data).hexdigest():
+            write_file(path, data)
 
     def to_json(self):
         """Mehod to output menu data into the JSON file.
 
         This method outputs the parsed file contents converted into JSON
-        format for each file that was parsed.
+        format for each file that was parsed. In incremental mode the
+        manifest is updated.
         """
-        for key in self.input_files.keys():
+        for key, menu_model in self.input_files.items():
+            if menu_model is None:
+                continue  # Did not change (incremental)
+
             # Output the configuration to the json output file
-            self.input_files[key].to_json(self.output_path, self.overwrite)
+            entry = self.manifest.pop(key, dict())
+            output = menu_model.to_json(self.output_path, self.overwrite,
+                                        self.on_existing,
+                                        entry.get('output'))
+            if output is not None and self.incremental:
+                self.entries[key] = {'hash': self.hashes[key],
+                                     'files': menu_model.get_file_list(),
+                                     'missing': menu_model.missing_files,
+                                     'output': output}
+
+        if self.incremental:
+            self.write_manifest()
 
 def main():
 
@@ -385,12 +724,29 @@ def main():
     args_pars.add_argument('outputfolder',
                            help='folder where the converted json file \
                            will be stored')
-    args_pars.add_argument('-o', '--overwrite', action='store_true',
-                           help='overwrite output files that already exist')
+    args_pars.add_argument('-o', '--overwrite', action='store_const',
+                           dest='on_existing', const='overwrite',
+                           help='overwrite output files that already exist '
+                           '(same as --on-existing overwrite)')
+    args_pars.add_argument('--on-existing',
+                           choices=['prompt', 'skip', 'overwrite'],
+                           help='what to do with existing output files that '
+                           'differ (default: prompt if run from a terminal, '
+                           'otherwise skip)')
+    args_pars.add_argument('-i', '--incremental', action='store_true',
+                           help='convert only files changed since the last '
+                           'incremental run')
     args_pars.add_argument('-s', '--single', action='store_true',
                            help='convert only a single file (nonrecursive)')
     args_pars.add_argument('-f', '--force', action='store_true',
                            help='continue even if some files cannot be found')
+    args_pars.add_argument('-j', '--jobs', type=int, default=1,
+                           help='number of files parsed in parallel '
+                           '(default: 1)')
+    args_pars.add_argument('--tokenizer', choices=['fast', 'pyparsing'],
+                           default='fast',
+                           help='how lines are split (default: fast, '
+                           'pyparsing: slower previous implementation)')
 
     args = args_pars.parse_args()
 
@@ -405,8 +761,14 @@ def main():
         print('Output path "%s" is not a directory!' % output_path)
         sys.exit(-1)
 
-    parser = LauncherMenuModelParser(tickle_path, output_path, args.overwrite)
-    parser.parse(args.single, args.force)
+    on_existing = args.on_existing
+    if not on_existing:
+        on_existing = 'prompt' if sys.stdin.isatty() else 'skip'
+
+    parser = LauncherMenuModelParser(tickle_path, output_path,
+                                     on_existing=on_existing,
+                                     incremental=args.incremental)
+    parser.parse(args.single, args.force, args.jobs, args.tokenizer)
     parser.to_json()
 
 
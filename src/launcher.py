@@ -10,31 +10,39 @@ from __future__ import absolute_import
 from __future__ import unicode_literals
 from __future__ import print_function
 from __future__ import division
-from builtins import *
-from future import standard_library
-standard_library.install_aliases()
-from builtins import object
+import sys
+# Profiling must start before anything else is imported (--profile-startup).
+from .launcher_profile import startup_profile
+if "--profile-startup" in sys.argv:
+    startup_profile.start()
+
+if sys.version_info[0] < 3:
+    # Importing future on python 3 only costs startup time.
+    from builtins import *
+    from future import standard_library
+    standard_library.install_aliases()
+    from builtins import object
 # ------end of python 2/3 compatibility imports-----
 
 
-import sys
 import os
 import platform
 import argparse
+import collections
+import hashlib
 import json
-import copy
 import enum
-import urllib.request, urllib.error, urllib.parse
-import urllib.parse
 import logging
 import re
-import shlex
-import subprocess
+import threading
+import time
 
 from PyQt4 import QtGui, QtCore
 from PyQt4.QtCore import pyqtSlot, Qt
 
 from .launcher_model import *
+from .launcher_search import launcher_search_index
+from .launcher_process import process_manager
 
 import signal
 signal.signal(signal.SIGINT, signal.SIG_DFL)
@@ -90,12 +98,30 @@ class LauncherWindow(QtGui.QMainWindow):
 
     """Launcher main window.
 
-    Main launcher window. At initialization recursively builds visualization
-    of launcher menus, builds menu bar, ...
+    Main launcher window. At initialization builds main button with the root
+    menu, builds menu bar, ... Items of each menu are visualized when the
+    menu is first shown or filtered.
+
+    If lazyLoad is True, submenu models are loaded (and visualized) when they
+    are first opened or filtered. With preload also True, the rest of the
+    menu tree is loaded in the background once the window is shown.
+    Menu files are fetched on loadWorkers threads in parallel (0 means
+    one file after another). If cacheDir is set, parsed menu files are
+    cached there and reused while files are not changed.
+    If unloadIdle is set, widgets of submenus that were not used for
+    unloadIdle seconds are removed (and built again when needed).
+    If watch is True, changed menu files are reloaded (see
+    LauncherMenuWatcher).
     """
 
-    def __init__(self, rootFilePath, cfg, parent=None):
+    def __init__(self, rootFilePath, cfg, parent=None, lazyLoad=False,
+                 preload=False, loadWorkers=0, cacheDir=None, unloadIdle=0,
+                 watch=False):
         QtGui.QMainWindow.__init__(self, parent)
+        self.lazyLoad = lazyLoad or preload
+        self.preload = preload
+        self.loadWorkers = loadWorkers
+        self.unloadIdle = unloadIdle
         # Get configuration for current system. platform.system() returns:
         #     - "Darwin" when OS X
         #     - "Linux" when Linux
@@ -104,7 +130,7 @@ class LauncherWindow(QtGui.QMainWindow):
         systemType = platform.system()
         if systemType == "Darwin":
             systemType = "OS_X"
-        self.launcherCfg = cfg.get(systemType)
+        self.launcherCfg = compile_launcher_cfg(cfg.get(systemType))
         # From menu file define root directory (launcher_base)
 
         path_tuple = os.path.split(rootFilePath)
@@ -113,17 +139,18 @@ class LauncherWindow(QtGui.QMainWindow):
         # Get defined theme base. If it is not url or absolute dir, make it
         # relative to config file.
 
-        theme_base = self.launcherCfg["theme_base"]
-        try:
-            urllib.request.urlopen(theme_base)
-        except (urllib.error.URLError, ValueError):
-            # Not an url. Check if absolute path.
+        self.launcherCfg["theme_base"] = join_launcher_path(
+            cfg["cfg_base"], self.launcherCfg["theme_base"])
+        self.styleRegistry = LauncherStyleRegistry(
+            self.launcherCfg["theme_base"])
 
-            if not os.path.isabs(theme_base):
-                self.launcherCfg["theme_base"] = os.path.join(cfg["cfg_base"],
-                                                              theme_base)
+        self.menuCache = None
+        if cacheDir:
+            self.menuCache = launcher_menu_cache(cacheDir, self.launcherCfg)
+        self.viewCache = LauncherViewCache()
 
         self.menuModel = self.buildMenuModel(rootFilePath)
+        startup_profile.mark("menu model")
         self.setWindowTitle(self.menuModel.main_title.text)
         # QMainWindow has predefined layout. Content should be in the central
         # widget. Create widget with a QVBoxLayout and set it as central.
@@ -160,28 +187,105 @@ class LauncherWindow(QtGui.QMainWindow):
         self.mainButton.setMouseTracking(True)
         self.searchInput.setMouseTracking(True)
 
+        # Collect exit codes of launched commands.
+        self.reapTimer = QtCore.QTimer(self)
+        self.reapTimer.timeout.connect(process_manager.reap)
+        self.reapTimer.start(1000)
+
+        self.unloadTimer = QtCore.QTimer(self)
+        self.unloadTimer.timeout.connect(self.unloadIdleMenus)
+        if self.unloadIdle:
+            self.unloadTimer.start(min(self.unloadIdle, 60) * 1000)
+
+        self.menuWatcher = None
+        if watch:
+            self.menuWatcher = LauncherMenuWatcher(self)
+        startup_profile.mark("main window")
+
+    def unloadIdleMenus(self):
+        """Remove widgets of submenus not used for unloadIdle seconds."""
+
+        self.launcherMenu.unloadIdleSubMenus(time.time() - self.unloadIdle)
+
+    def preloadMenuModel(self):
+        """Load the rest of the menu tree in a background thread."""
+
+        preloadThread = threading.Thread(target=self.menuModel.loader.preload,
+                                         args=(self.menuModel,))
+        preloadThread.daemon = True
+        preloadThread.start()
+
     def setNewView(self, rootMenuFile, text=None):
         """Rebuild launcher from new config file.
 
-        Destroy previous model and create new one. Build menus and edit main
+        Previous view (model and menus) is put to the view cache. If new view
+        is in the cache it is reused, otherwise its model is built. Edit main
         window elements.
         """
         self.menuModel.choice_element.text = self.windowTitle()
         self.viewMenu.addToHistory(self.menuModel.choice_element)
-        del self.menuModel
-
-        self.menuModel = self.buildMenuModel(rootMenuFile)
+        self.menuModel.loader.close()
+        # Detached and search windows of previous view are closed.
+        for window in self.launcherMenu.findChildren(LauncherDetachedMenu) + \
+                self.launcherMenu.findChildren(LauncherSearchMenuView):
+            window.deleteLater()
+        self.viewCache.put(self.rootMenuPath, self.menuModel,
+                           self.launcherMenu,
+                           self.launcherCfg["launcher_base"])
+
+        rootMenuPath = join_launcher_path(
+            self.launcherCfg.get("launcher_base"), rootMenuFile)
+        cachedView = self.viewCache.take(rootMenuPath)
+        if cachedView:
+            self.menuModel, self.launcherMenu, launcherBase = cachedView
+            self.launcherCfg["launcher_base"] = launcherBase
+            self.rootMenuPath = rootMenuPath
+        else:
+            self.menuModel = self.buildMenuModel(rootMenuFile)
+            self.launcherMenu = LauncherSubMenu(self.menuModel,
+                                                self.mainButton, self)
         if text:
             self.setWindowTitle(text)
         else:
             self.setWindowTitle(self.menuModel.main_title.text)
         self.mainButton.restyle(self.menuModel.main_title)
-        self.launcherMenu.deleteLater()
-        self.launcherMenu = LauncherSubMenu(self.menuModel, self.mainButton,
-                                            self)
         self.mainButton.setMenu(self.launcherMenu)
         self.viewMenu.buildViewMenu(self.menuModel)
         self.searchInput.setMenu(self.launcherMenu)
+        if self.preload:
+            self.preloadMenuModel()
+        if self.menuWatcher:
+            self.menuWatcher.watchMenuFiles()
+
+    def reloadMenuFiles(self, filePaths):
+        """Reload models of changed menu files and rebuild their menus.
+
+        Only menus (also detached ones) showing a reloaded model are
+        rebuilt. Open search windows take the items of the reloaded tree
+        and search their term again. Cached views using any of the files
+        are dropped.
+        """
+        changed = set(launcher_path_key(path) for path in filePaths)
+        menus = self.menuModel.loaded_menus()
+        reloaded = [menu for menu in menus
+                    if launcher_path_key(menu.menu_path) in changed and
+                    menu.reload()]
+        self.viewCache.dropFiles(changed)
+        if not reloaded:
+            return
+
+        if not self.lazyLoad:
+            self.menuModel.loader.close()  # Stop workers, save cache.
+        launcher_search_index.invalidate(self.menuModel.loaded_menus())
+        for launcherMenu in self.findChildren(LauncherMenu):
+            if isinstance(launcherMenu, LauncherSearchMenuView):
+                launcherMenu.reloadItems()
+            elif launcherMenu.loadedModel in reloaded:
+                launcherMenu.reloadMenu()
+        if self.menuModel in reloaded:
+            self.setWindowTitle(self.menuModel.main_title.text)
+            self.mainButton.restyle(self.menuModel.main_title)
+            self.viewMenu.buildViewMenu(self.menuModel)
 
     def changeEvent(self, changeEvent):
         """Catch when main window is selected and set focus to search."""
@@ -202,15 +306,185 @@ class LauncherWindow(QtGui.QMainWindow):
                                         rootMenuPath)
 
         self.launcherCfg["launcher_base"] = os.path.dirname(rootMenuFullPath)
+        self.rootMenuPath = rootMenuFullPath
 
+        loader = launcher_menu_loader(self.lazyLoad, self.loadWorkers,
+                                      self.menuCache)
         try:
-            rootMenu = launcher_menu_model(None, rootMenuFullPath, 0, self.launcherCfg)
+            rootMenu = launcher_menu_model(None, rootMenuFullPath, 0,
+                                           self.launcherCfg, loader)
         except IOError:
             errMsg = "File \"" + rootMenuPath + "\" not found."
             logging.error(errMsg)
             sys.exit()
+        finally:
+            if not self.lazyLoad:
+                loader.close()  # Whole tree is loaded. Stop the workers.
         return rootMenu
 
+    def closeMenuModel(self):
+        """Stop loading of current menu model and save menu cache."""
+        self.menuModel.loader.close()
+
+
+class LauncherViewCache(object):
+
+    """Recently used views (menu model and its root menu) of the window.
+
+    Views are kept by resolved root menu file (launcher_path_key, same as
+    models in the loader), so switching back to a recent view does not load
+    and build it again, however the file is referenced. Least recently used
+    views are dropped when there are more than maxViews or their estimated
+    size exceeds maxSize (bytes). Size of a view is estimated from the
+    number of loaded items.
+    """
+
+    maxViews = 5
+    maxSize = 64 * 1024 * 1024
+    itemSize = 4 * 1024  # Model item with its widgets
+
+    def __init__(self):
+        self.views = collections.OrderedDict()  # path key: (view, size)
+
+    def put(self, rootMenuPath, menuModel, launcherMenu, launcherBase):
+        launcherMenu.hide()
+        size = menuModel.loaded_item_count() * self.itemSize
+        pathKey = launcher_path_key(rootMenuPath)
+        self.views.pop(pathKey, None)
+        self.views[pathKey] = ((menuModel, launcherMenu, launcherBase), size)
+        totalSize = sum(size for view, size in self.views.values())
+        while self.views and (len(self.views) > self.maxViews or
+                              totalSize > self.maxSize):
+            path, (view, size) = self.views.popitem(last=False)
+            totalSize -= size
+            self.drop(view)
+
+    def take(self, rootMenuPath):
+        """Remove view from cache and return it (None if not cached)."""
+
+        view = self.views.pop(launcher_path_key(rootMenuPath), None)
+        if view:
+            return view[0]
+        return None
+
+    def drop(self, view):
+        menuModel, launcherMenu, launcherBase = view
+        launcherMenu.deleteLater()
+
+    def dropFiles(self, pathKeys):
+        """Drop views which use any of the menu files (launcher_path_key)."""
+
+        for path, (view, size) in list(self.views.items()):
+            for menu in view[0].loaded_menus():
+                if launcher_path_key(menu.menu_path) in pathKeys:
+                    del self.views[path]
+                    self.drop(view)
+                    break
+
+
+class LauncherMenuWatcher(QtCore.QObject):
+
+    """Reloads changed menu files of the window's current view.
+
+    Local menu files are watched with QFileSystemWatcher (inotify on Linux).
+    Files on a web server are polled every pollInterval milliseconds in a
+    background thread. The same timer also starts watching submenus loaded
+    in the meantime (lazy loading). Changes are collected for reloadDelay
+    milliseconds, so a file written in several steps is reloaded once.
+    """
+
+    pollInterval = 5000
+    reloadDelay = 200
+    urlsPolled = QtCore.pyqtSignal(object)
+
+    def __init__(self, window):
+        QtCore.QObject.__init__(self, window)
+        self.window = window
+        self.files = set()
+        self.urlStamps = dict()  # url: hash of content (None until polled)
+        self.polling = False
+        self.changed = set()
+        self.fileWatcher = QtCore.QFileSystemWatcher(self)
+        self.fileWatcher.fileChanged.connect(self.fileChanged)
+        self.urlsPolled.connect(self.applyUrlStamps)
+        self.reloadTimer = QtCore.QTimer(self)
+        self.reloadTimer.setSingleShot(True)
+        self.reloadTimer.setInterval(self.reloadDelay)
+        self.reloadTimer.timeout.connect(self.reloadChanged)
+        self.pollTimer = QtCore.QTimer(self)
+        self.pollTimer.timeout.connect(self.poll)
+        self.pollTimer.start(self.pollInterval)
+        self.watchMenuFiles()
+
+    def watchMenuFiles(self):
+        """Watch files of all loaded menus of the current view."""
+
+        paths = set(menu.menu_path
+                    for menu in self.window.menuModel.loaded_menus())
+        files = set(path for path in paths if not is_launcher_url(path))
+        removed = self.files - files
+        if removed:
+            self.fileWatcher.removePaths(list(removed))
+        # Files that are replaced (e.g. saved by an editor) are not watched
+        # any more. They are added again once they exist.
+        added = [path for path in files - self.files if os.path.exists(path)]
+        if added:
+            self.fileWatcher.addPaths(added)
+        self.files = (self.files - removed).union(added)
+
+        urls = paths - files
+        self.urlStamps = dict((url, self.urlStamps.get(url)) for url in urls)
+
+    def fileChanged(self, filePath):
+        filePath = str(filePath)
+        self.fileWatcher.removePath(filePath)
+        self.files.discard(filePath)
+        self.changed.add(filePath)
+        self.reloadTimer.start()
+
+    def poll(self):
+        """Check menus on web servers for changes in a background thread."""
+
+        self.watchMenuFiles()
+        if self.polling or not self.urlStamps:
+            return
+
+        self.polling = True
+        urls = list(self.urlStamps)
+
+        def readStamps():
+            stamps = dict()
+            for url in urls:
+                try:
+                    stamps[url] = hashlib.sha1(
+                        read_launcher_file(url)[0]).hexdigest()
+                except IOError:
+                    pass  # Not available at the moment. Check again later.
+            try:
+                self.urlsPolled.emit(stamps)
+            except RuntimeError:
+                pass  # Watcher was deleted in the meantime.
+
+        pollThread = threading.Thread(target=readStamps)
+        pollThread.daemon = True
+        pollThread.start()
+
+    def applyUrlStamps(self, stamps):
+        self.polling = False
+        for url, stamp in stamps.items():
+            if url not in self.urlStamps:
+                continue  # Not in the current view any more.
+            if self.urlStamps[url] not in (None, stamp):
+                self.changed.add(url)
+                self.reloadTimer.start()
+            self.urlStamps[url] = stamp
+
+    def reloadChanged(self):
+        changed = self.changed
+        self.changed = set()
+        self.window.reloadMenuFiles(changed)
+        self.watchMenuFiles()
+
 
 class LauncherMenu(QtGui.QMenu):
 
@@ -219,17 +493,50 @@ class LauncherMenu(QtGui.QMenu):
     Is a parent super class which takes the model of menu as an argument and
     builds a "vital" part of the menu. It also implements methods for menu
     manipulation.
+
+    If menuItem (launcher_sub_menu_item) is given instead of menuModel, the
+    model is taken from the item when it is first needed, so the submenu
+    file is read only when the menu is shown, filtered or searched.
     """
 
-    def __init__(self, menuModel, button=None, parent=None):
+    def __init__(self, menuModel, button=None, parent=None, menuItem=None):
         QtGui.QMenu.__init__(self, parent)
         self.setSeparatorsCollapsible(False)
         self.filterTerm = ""
-        self.menuModel = menuModel
-        self.buildMenu(self.menuModel.menu_items)
+        # Model of the menu, None until it is loaded from menuItem.
+        self.loadedModel = menuModel
+        self.menuItem = menuItem
         self.initFilterVisibility = True
         self.filterConditions = [False, True, False]
         self.button = button
+        # Menu items are built when menu is first shown or filtered.
+        self.menuBuilt = False
+        self.lastUsed = 0
+        self.aboutToShow.connect(self.ensureMenuBuilt)
+
+    @property
+    def menuModel(self):
+        if self.loadedModel is None:
+            # Menu with invalid file is shown empty.
+            self.loadedModel = self.menuItem.load_sub_menu() or \
+                launcher_menu_model.empty(self.menuItem)
+            if self.button is not None:
+                # Tool tip is set again with the title of the menu.
+                self.button.setToolTip("")
+        return self.loadedModel
+
+    def ensureMenuBuilt(self):
+        """Build menu items if they were not built yet."""
+
+        self.lastUsed = time.time()
+        if not self.menuBuilt:
+            self.menuBuilt = True
+            # Menu indicator style is set once for all buttons in the menu.
+            self.styleRegistry = LauncherStyleRegistry.forWidget(
+                self.parent())
+            self.setStyleSheet(useQLatin1String(
+                self.styleRegistry.indicatorStyle))
+            self.buildMenu(self.menuModel.menu_items)
 
     def buildMenu(self, menuModel):
         """Visualize menu
@@ -252,6 +559,56 @@ class LauncherMenu(QtGui.QMenu):
             elif item.__class__.__name__ == "launcher_item_separator":
                 self.addAction(LauncherSeparator(item, self))
 
+    def subMenus(self):
+        """Return sub menus of built LauncherMenuButton items."""
+
+        subMenus = list()
+        for action in self.actions():
+            if isinstance(action, LauncherMenuWidgetAction) and \
+                    isinstance(action.defaultWidget(), LauncherMenuButton):
+                subMenus.append(action.defaultWidget().menu())
+        return subMenus
+
+    def unloadIdleSubMenus(self, usedBefore):
+        """Recursively unload sub menus that were not used since usedBefore.
+
+        Shown and filtered menus are kept.
+        """
+
+        for subMenu in self.subMenus():
+            if subMenu.menuBuilt and subMenu.lastUsed < usedBefore and \
+                    not subMenu.isVisible() and not subMenu.filterTerm:
+                subMenu.unloadMenu()
+            else:
+                subMenu.unloadIdleSubMenus(usedBefore)
+
+    def unloadMenu(self):
+        """Remove all menu items. They are built again when needed."""
+
+        for subMenu in self.subMenus():
+            subMenu.deleteLater()
+        self.clear()
+        self.action = None
+        self.menuBuilt = False
+
+    def reloadMenu(self):
+        """Rebuild menu items from the (reloaded) model.
+
+        Menus which are not shown or filtered are built again when needed.
+        Current filter is applied to the new items.
+        """
+
+        if not self.menuBuilt:
+            return
+        visible = self.isVisible()
+        filterTerm = self.filterTerm
+        self.unloadMenu()
+        if visible or filterTerm:
+            self.ensureMenuBuilt()
+            if filterTerm:
+                self.filterMenu(filterTerm)
+            self.adjustSize()
+
     def appendToMenu(self, widget):
         """Append action to menu.
 
@@ -289,80 +646,96 @@ class LauncherMenu(QtGui.QMenu):
 
         return candidate
 
-    def filterMenu(self, filterTerm=None):
+    def filterMenu(self, filterTerm=None, filterResult=None):
         """Filter menu items with filterTerm
 
         Shows/hides menu items depending on filterTerm. Returns true if has
         visible active (buttons) items.
+
+        Matching items are found in the search index of the menu model.
+        filterResult (matching items and submenus leading to them) is passed
+        to submenus, so the index is searched only once. Visibility is
+        changed only for items where it differs from the current one.
         """
 
+        if not filterTerm and not self.menuBuilt:
+            # Nothing to reset in a menu which was not built yet.
+            self.filterTerm = filterTerm
+            return False
+
+        self.ensureMenuBuilt()
         self.filterTerm = filterTerm
         hasVisible = False
-        # Read filters
 
-        sensitivityFilter = self.filterConditions[
-            SearchOptions.sensitivity.value]
-        textFilter = self.filterConditions[SearchOptions.text.value]
-        cmdFilter = self.filterConditions[SearchOptions.cmd.value]
+        if filterTerm and filterResult is None:
+            filterResult = self.searchFilterTerm(filterTerm)
+        matchedItems, visibleMenus = filterResult or (set(), set())
+        # First decide visibility of all items, then apply it. This way
+        # section titles are not hidden and shown again.
+
+        newVisibility = list()
+        shownTitles = set()
         # Skip first item since it is either search entry or detach button.
 
         for action in self.actions()[1:len(self.actions())]:
             if action.__class__.__name__ == "LauncherMenuWidgetAction":
                 widget = action.defaultWidget()
-                # Search is always only on NamedButtons. Get text from their
-                # models to avoid searching also the prefixes added later (in
-                # search view).
-
-                if isinstance(widget, LauncherNamedButton):
-                    text = useQString(widget.itemModel.text)
-
                 widgetType = widget.__class__.__name__
             else:
                 widget = None
                 widgetType = None
-                text = useQString("")
 
             if action.__class__.__name__ == "LauncherSeparator":
-                action.setVisibility(not filterTerm and self.initFilterVisibility)
+                visible = not filterTerm and self.initFilterVisibility
             elif not filterTerm:
                 # Empty filter. Show depending on type. If submenu recursively
                 # empty  filter.
 
-                action.setVisibility(self.initFilterVisibility)
+                visible = self.initFilterVisibility
                 if widgetType == "LauncherMenuButton":
                     widget.menu().filterMenu(filterTerm)
 
-            elif widgetType == "LauncherMenuTitle":
-                action.setVisibility(False)
-
-            elif widgetType == "LauncherSubMenuAsTitle":
-                action.setVisibility(False)
-
             elif widgetType == "LauncherMenuButton":
                 # Recursively filter menus. Show only sub-menus that have
-                # visible items.
-                subMenu = widget.menu()
-                subHasVisible = subMenu.filterMenu(filterTerm)
-                hasVisible = hasVisible or subHasVisible
-                action.setVisibility(subHasVisible)
-
-            elif textFilter and text.contains(filterTerm,
-                                              sensitivityFilter):
-                action.setVisibility(True)
+                # visible items. Others are filtered when they get visible.
+                visible = widget.itemModel in visibleMenus
+                if visible:
+                    widget.menu().filterMenu(filterTerm, filterResult)
+                hasVisible = hasVisible or visible
+
+            elif widgetType == "LauncherCmdButton" and \
+                    widget.itemModel in matchedItems:
+                visible = True
                 hasVisible = True
 
-            elif widgetType == "LauncherCmdButton" and cmdFilter and\
-                useQString(widget.cmd).contains(filterTerm,
-                                                    sensitivityFilter):
+            else:
+                # Titles, and buttons that do not match.
+                visible = False
 
-                action.setVisibility(True)
-                hasVisible = True
+            if visible and widget is not None and widget.sectionTitle:
+                shownTitles.add(widget.sectionTitle.myAction)
+            newVisibility.append((action, visible))
 
-            else:
-                action.setVisibility(False)
+        for action, visible in newVisibility:
+            action.setVisibility(visible or action in shownTitles)
 
         return hasVisible
 
+    def searchFilterTerm(self, filterTerm, cancelled=None):
+        """Return items matching filterTerm and submenus leading to them.
+
+        Only the model is searched, so it can be called from any thread.
+        Returns None if search was cancelled (see launcher_search_index).
+        """
+
+        searchIndex = launcher_search_index.for_menu(self.menuModel)
+        return searchIndex.search(
+            filterTerm,
+            self.filterConditions[SearchOptions.sensitivity.value],
+            self.filterConditions[SearchOptions.text.value],
+            self.filterConditions[SearchOptions.cmd.value],
+            cancelled)
+
     def showEvent(self, showEvent):
         """Catch event when menu is shown and move it by side.
 
@@ -417,11 +790,15 @@ class LauncherSubMenu(LauncherMenu):
     Implements a visualization of the menu when used as a sub menu. Popuped
     from the main menu or button.
 
-    Creates detach button and adds it to the menu.
+    Creates detach button and adds it to the menu when menu is built.
     """
 
-    def __init__(self, menuModel, button, parent=None):
-        LauncherMenu.__init__(self, menuModel, button, parent)
+    def __init__(self, menuModel, button, parent=None, menuItem=None):
+        LauncherMenu.__init__(self, menuModel, button, parent, menuItem)
+        self.detachButton = None
+
+    def buildMenu(self, menuModel):
+        LauncherMenu.buildMenu(self, menuModel)
         self.detachButton = LauncherDetachButton(self)
         self.insertToMenu(self.detachButton, 0)
 
@@ -465,12 +842,27 @@ class LauncherDetachedMenu(LauncherMenu):
 
     def __init__(self, menuModel, parent=None):
         LauncherMenu.__init__(self, menuModel, None, parent)
+        self.ensureMenuBuilt()
         self.searchInput = LauncherFilterWidget(self, self)
         self.insertToMenu(self.searchInput, 0)
         self.setWindowFlags(Qt.Window)
         self.setAttribute(Qt.WA_X11NetWmWindowTypeMenu, True)
         self.setEnabled(True)
 
+    def reloadMenu(self):
+        """Rebuild menu items from the (reloaded) model. Keep filter input.
+        """
+
+        for subMenu in self.subMenus():
+            subMenu.deleteLater()
+        for action in self.actions()[1:]:
+            self.removeAction(action)
+            action.deleteLater()
+        self.buildMenu(self.menuModel.menu_items)
+        if self.filterTerm:
+            self.filterMenu(self.filterTerm)
+        self.adjustSize()
+
     def hide(self):
         pass  # Detached menu should not be hidden at any action (left key).
 
@@ -504,46 +896,50 @@ class LauncherSearchMenuView(LauncherMenu):
 
     Different visualization of launcher for searching. Submenues do not
     expand, but are rather included at the bottom of the list.
+
+    Instead of a widget per item, items are shown in a list view over
+    LauncherSearchModel, so only the visible rows are drawn. Filtering
+    changes rows of the model.
     """
 
     def __init__(self, menuModel, button=None, parent=None):
         LauncherMenu.__init__(self, menuModel, button, parent)
+        self.ensureMenuBuilt()
         self.searchWidget = LauncherSearchWidget(self, self.getMainMenu())
         self.insertToMenu(self.searchWidget, 0)
-        self.initFilterVisibility = False
 
     def buildMenu(self, menuModel):
         """Visualize menu
 
         Override this method and build different visualization.
         """
-        cMenuItems = list(self.menuModel.menu_items)
-        level = 0
-        sectionTitle = None
-        for item in cMenuItems:
-            levelPrefix = ""
-            addPrefix = False
-            for traceItem in item.trace:
-                levelPrefix = levelPrefix + traceItem.text + " > "
-            if item.__class__.__name__ == "launcher_cmd_item":
-                button = LauncherCmdButton(item, sectionTitle, self)
-                self.appendToMenu(button)
-                addPrefix = True
-            elif item.__class__.__name__ == "launcher_sub_menu_item":
-                # Take subemnu model and build (visualize) it below
 
-                cSubMenuItems = copy.copy(item.sub_menu.menu_items)
-                cMenuItems.extend(cSubMenuItems)
-            elif item.__class__.__name__ == "launcher_title_item":
-                button = LauncherMenuTitle(item, None, self)
-                self.appendToMenu(button)
-                sectionTitle = button
-                addPrefix = True
-            elif item.__class__.__name__ == "launcher_item_separator":
-                self.addAction(LauncherSeparator(item, self))
+        self.searchModel = LauncherSearchModel(self.menuModel, self)
+        self.searchList = LauncherSearchListView(self.searchModel, self)
+        self.appendToMenu(self.searchList)
+
+    def filterMenu(self, filterTerm=None, filterResult=None):
+        """Show items matching filterTerm (and their section titles).
+
+        Returns true if any item matches.
+        """
+
+        self.ensureMenuBuilt()
+        self.filterTerm = filterTerm
+        matchedItems = set()
+        if filterTerm:
+            if filterResult is None:
+                filterResult = self.searchFilterTerm(filterTerm)
+            matchedItems = filterResult[0]
+        self.searchModel.showItems(matchedItems)
+        return bool(matchedItems)
+
+    def reloadItems(self):
+        """Take items of the (reloaded) tree and apply the filter again."""
 
-            if addPrefix:  # Add level prefix
-                button.setText(levelPrefix + button.text())
+        if self.menuBuilt:
+            self.searchModel.buildItems(self.menuModel)
+            self.filterMenu(self.filterTerm)
 
     def exposeMenu(self, searchInput=None):
         """Open menu in new window.
@@ -577,6 +973,125 @@ class LauncherSearchMenuView(LauncherMenu):
         pass
 
 
+class LauncherSearchModel(QtCore.QAbstractListModel):
+
+    """List of all titles and commands of a menu tree.
+
+    Items of submenus follow items of the menu (same order as used to be
+    visualized in search). Text of each item is prefixed with the titles
+    of submenus that lead to it. Only rows of items given to showItems()
+    and their section titles are shown.
+    """
+
+    def __init__(self, menuModel, parent=None):
+        QtCore.QAbstractListModel.__init__(self, parent)
+        self.items = list()  # (item, text, index of section title or None)
+        self.rows = list()  # Indexes of shown items
+        self.buildItems(menuModel)
+
+    def buildItems(self, menuModel):
+        """Take items of the menuModel tree. No rows are shown after it."""
+
+        items = list()
+        menus = [(menuModel, "")]
+        for menu, prefix in menus:
+            sectionTitle = None
+            for item in menu.menu_items:
+                className = item.__class__.__name__
+                if className == "launcher_cmd_item":
+                    items.append((item, prefix + item.text, sectionTitle))
+                elif className == "launcher_title_item":
+                    sectionTitle = len(items)
+                    items.append((item, prefix + item.text, None))
+                elif className == "launcher_sub_menu_item":
+                    subMenu = item.load_sub_menu()
+                    if subMenu is not None:
+                        menus.append((subMenu, prefix + item.text + " > "))
+        self.beginResetModel()
+        self.items = items
+        self.rows = list()
+        self.endResetModel()
+
+    def showItems(self, items):
+        """Show only rows of items (and titles of their sections)."""
+
+        rows = list()
+        shownTitle = None
+        for index, (item, text, sectionTitle) in enumerate(self.items):
+            if item in items:
+                if sectionTitle is not None and sectionTitle != shownTitle:
+                    rows.append(sectionTitle)
+                    shownTitle = sectionTitle
+                rows.append(index)
+        self.beginResetModel()
+        self.rows = rows
+        self.endResetModel()
+
+    def itemAt(self, index):
+        return self.items[self.rows[index.row()]][0]
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        item, text, sectionTitle = self.items[self.rows[index.row()]]
+        isCmd = item.__class__.__name__ == "launcher_cmd_item"
+        if role == Qt.DisplayRole:
+            return text
+        elif role == Qt.ToolTipRole and isCmd:
+            toolTip = ""
+            if item.tip:
+                toolTip = item.tip + " "
+            return toolTip + "[Command: " + item.cmd + "]"
+        elif role == Qt.FontRole and not isCmd:
+            font = QtGui.QFont()
+            font.setBold(True)
+            return font
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        if self.itemAt(index).__class__.__name__ == "launcher_cmd_item":
+            return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        return Qt.ItemIsEnabled  # Titles are passive
+
+
+class LauncherSearchListView(QtGui.QListView):
+
+    """Shows search results. Command is executed when item is clicked."""
+
+    def __init__(self, searchModel, parent=None):
+        QtGui.QListView.__init__(self, parent)
+        self.sectionTitle = None
+        self.myAction = None
+        self.setModel(searchModel)
+        self.setUniformItemSizes(True)
+        self.setMinimumSize(400, 400)
+        self.setMouseTracking(True)
+        self.clicked.connect(self.executeCmd)
+
+    def setMyAction(self, action):
+        self.myAction = action
+
+    def executeCmd(self, index):
+        clickTime = time.time()
+        if index.isValid() and index.flags() & Qt.ItemIsSelectable:
+            executeCommand(self.model().itemAt(index), self, clickTime)
+
+    def keyPressEvent(self, event):
+        """Execute command of current item with return or enter key."""
+
+        if event.key() == Qt.Key_Return or event.key() == Qt.Key_Enter:
+            self.executeCmd(self.currentIndex())
+        else:
+            QtGui.QListView.keyPressEvent(self, event)
+
+
 class LauncherMenuWidgetAction(QtGui.QWidgetAction):
 
     """Wrap widgets to be added to menu.
@@ -594,10 +1109,14 @@ class LauncherMenuWidgetAction(QtGui.QWidgetAction):
         widget.setMyAction(self)  # Let widget know about action.
 
     def setVisibility(self, visibility):
-        """Set visibility of both the widget action and the widget."""
+        """Set visibility of both the widget action and the widget.
 
-        self.setVisible(visibility)
-        self.widget.setVisible(visibility)
+        Nothing is changed if action already has requested visibility.
+        """
+
+        if visibility != self.isVisible():
+            self.setVisible(visibility)
+            self.widget.setVisible(visibility)
         if self.widget.sectionTitle and visibility:
             self.widget.sectionTitle.myAction.setVisibility(True)
 
@@ -610,12 +1129,28 @@ class LauncherFilterLineEdit(QtGui.QLineEdit):
     recursively by putting the filter  to child menus. It has a button to clear
     current input with one click. When enter button is pressed a search window
     with results is opened.
+
+    Filtering starts when typing pauses for filterDelay milliseconds. Items
+    are searched in a background thread and only the result of the latest
+    filter term is applied to the menus. Older searches are cancelled.
+    Errors of the search are reported to the GUI thread with filterFailed.
     """
 
+    filterDelay = 150
+    filterResultReady = QtCore.pyqtSignal(object, object, object)
+    filterFailed = QtCore.pyqtSignal(object, object, object)
+
     def __init__(self, menu, parent=None):
         QtGui.QLineEdit.__init__(self, parent)
         self.menu = menu
-        self.textChanged.connect(lambda: self.menu.filterMenu(self.text()))
+        self.filterGeneration = 0
+        self.filterTimer = QtCore.QTimer(self)
+        self.filterTimer.setSingleShot(True)
+        self.filterTimer.setInterval(self.filterDelay)
+        self.filterTimer.timeout.connect(self.startFilter)
+        self.textChanged.connect(lambda: self.filterTimer.start())
+        self.filterResultReady.connect(self.applyFilter)
+        self.filterFailed.connect(self.reportFilterError)
         self.myAction = None
         self.setPlaceholderText("Enter filter term.")
         # Create button to clear text and add it to the right edge of the
@@ -650,6 +1185,52 @@ class LauncherFilterLineEdit(QtGui.QLineEdit):
                                  self.clearButton.width(), 0)
         self.clearButton.move(position)
 
+    def startFilter(self):
+        """Search current filter term in a background thread.
+
+        Empty term (reset of the filter) is applied immediately.
+        """
+
+        self.filterGeneration += 1
+        generation = self.filterGeneration
+        filterTerm = self.text()
+        if not filterTerm:
+            self.menu.filterMenu(filterTerm)
+            return
+
+        menu = self.menu
+
+        def search():
+            try:
+                try:
+                    result = menu.searchFilterTerm(
+                        filterTerm,
+                        cancelled=lambda: generation != self.filterGeneration)
+                except (Exception, SystemExit) as e:
+                    self.filterFailed.emit(generation, filterTerm, e)
+                    return
+                self.filterResultReady.emit(generation, filterTerm, result)
+            except RuntimeError:
+                pass  # Widget was deleted in the meantime.
+
+        searchThread = threading.Thread(target=search)
+        searchThread.daemon = True
+        searchThread.start()
+
+    def applyFilter(self, generation, filterTerm, result):
+        """Apply search result if it belongs to the latest filter term."""
+
+        if generation == self.filterGeneration and result is not None:
+            self.menu.filterMenu(filterTerm, result)
+
+    def reportFilterError(self, generation, filterTerm, error):
+        """Log error of the search. Nothing is shown as matching."""
+
+        logging.error("Filter \"" + filterTerm + "\" failed (" +
+                      repr(error) + ").")
+        if generation == self.filterGeneration:
+            self.menu.filterMenu(filterTerm, (set(), set()))
+
     def keyPressEvent(self, event):
         """Catch key pressed event.
 
@@ -798,7 +1379,8 @@ class LauncherSeparator(QtGui.QAction):
         self.setSeparator(True)
 
     def setVisibility(self, visibility):
-        self.setVisible(visibility)
+        if visibility != self.isVisible():
+            self.setVisible(visibility)
 
 
 class LauncherMenuTitle(QtGui.QLabel):
@@ -815,8 +1397,9 @@ class LauncherMenuTitle(QtGui.QLabel):
         self.sectionTitle = sectionTitle
         # Apply custom styles
 
-        style = LauncherStyle(self, itemModel.theme, itemModel.style)
-        self.setStyleSheet(style.style)
+        if itemModel.theme or itemModel.style:
+            self.setStyleSheet(LauncherStyleRegistry.forWidget(self).getStyle(
+                self, itemModel.theme, itemModel.style))
 
     def setMyAction(self, action):
         self.myAction = action
@@ -925,18 +1508,11 @@ class LauncherMainButton(LauncherButton):
     def restyle(self, itemModel):
         self.setText(itemModel.text.replace('&', '&&'))  # For QButton &X means that X is shortcut, && gives &
         style = LauncherStyle(self, itemModel.theme, itemModel.style)
-        # Add menu arrow indicator. Added here to use right path and avoid
-        # compiling python code
+        # Add menu arrow indicator. Main button is not in a menu, so it is
+        # added to its own style.
 
-        currDir = os.path.dirname(os.path.realpath(__file__))
-        indicator = os.path.join(currDir, "resources/images/caret-right.png")
-        indicator = os.path.normpath(indicator)
-        # Even on windows a path to the image must be with forward slashes.
-
-        indicator = re.sub(r'\\', '/', indicator)
-        indicatorStyle = "LauncherButton:menu-indicator {image: url(" +\
-            indicator + ");subcontrol-position: right center}"
-        style.appendClassStyle(indicatorStyle)
+        style.appendClassStyle(
+            LauncherStyleRegistry.forWidget(self).indicatorStyle)
         self.setStyleSheet(style.style)
 
     def mouseMoveEvent(self, event):
@@ -966,20 +1542,12 @@ class LauncherNamedButton(LauncherButton):
     def __init__(self, itemModel, sectionTitle=None, parent=None):
         LauncherButton.__init__(self, sectionTitle, parent)
         self.setText(itemModel.text.replace('&', '&&'))  # For QButton &X means that X is shortcut, && gives &
-        style = LauncherStyle(self, itemModel.theme, itemModel.style)
-        # Add menu arrow indicator. Added here to use right path and avoid
-        # compiling python code
-
-        currDir = os.path.dirname(os.path.realpath(__file__))
-        indicator = os.path.join(currDir, "resources/images/caret-right.png")
-        indicator = os.path.normpath(indicator)
-        # Even on windows a path to the image must be with forward slashes.
+        # Menu arrow indicator is styled by the menu. Set style sheet only if
+        # custom theme or style is used.
 
-        indicator = re.sub(r'\\', '/', indicator)
-        indicatorStyle = "LauncherButton:menu-indicator {image: url(" +\
-            indicator + ");subcontrol-position: right center}"
-        style.appendClassStyle(indicatorStyle)
-        self.setStyleSheet(style.style)
+        if itemModel.theme or itemModel.style:
+            self.setStyleSheet(LauncherStyleRegistry.forWidget(self).getStyle(
+                self, itemModel.theme, itemModel.style))
 
         if itemModel.help_link:
             helpAction = QtGui.QAction("&Help", self)
@@ -989,6 +1557,16 @@ class LauncherNamedButton(LauncherButton):
 
         self.itemModel = itemModel
 
+    def event(self, event):
+        """Set tool tip when it is first needed."""
+
+        if event.type() == QtCore.QEvent.ToolTip and not self.toolTip():
+            self.setToolTip(self.toolTipText())
+        return LauncherButton.event(self, event)
+
+    def toolTipText(self):
+        return self.itemModel.tip or ""
+
     def openHelp(self):
         """ Open help link in default browser. """
 
@@ -1006,12 +1584,11 @@ class LauncherCmdButton(LauncherNamedButton):
         self.cmd = itemModel.cmd
         self.clicked.connect(self.executeCmd)
 
+    def toolTipText(self):
         toolTip = ""
-        if itemModel.tip:
-            toolTip = itemModel.tip + " "
-        toolTip = toolTip + "[Command: " + self.cmd + "]"
-
-        self.setToolTip(toolTip)
+        if self.itemModel.tip:
+            toolTip = self.itemModel.tip + " "
+        return toolTip + "[Command: " + self.cmd + "]"
 
     def executeCmd(self):
         """ Run specified command as a separate process
@@ -1020,13 +1597,9 @@ class LauncherCmdButton(LauncherNamedButton):
         started. Apart from "bash" it aboarts scripts without shebang on
         first line (strictly).
         """
+        clickTime = time.time()
         self.parent().hideAll()  # When done hide all popuped menus
-        try:
-            subprocess.Popen(shlex.split(self.cmd))
-        except OSError:
-            warn_msg = "Command \"" + self.cmd + "\" cannot be executed. " + \
-                "Wrong path or bad/no interpreter."
-            logging.warning(warn_msg)
+        executeCommand(self.itemModel, self, clickTime)
 
 
 class LauncherMenuButton(LauncherNamedButton):
@@ -1039,15 +1612,23 @@ class LauncherMenuButton(LauncherNamedButton):
 
     def __init__(self, itemModel, sectionTitle=None, parent=None):
         LauncherNamedButton.__init__(self, itemModel, sectionTitle, parent)
-        menu = LauncherSubMenu(itemModel.sub_menu, self, self.parent())
+        # Model and items of the menu are loaded when it is first shown or
+        # filtered.
+        menu = LauncherSubMenu(None, self, self.parent(), itemModel)
         self.setMenu(menu)
 
-        toolTip = ""
-        if itemModel.tip:
-            toolTip = itemModel.tip + " "
-        toolTip = toolTip + "[Menu: " + menu.menuModel.main_title.text + "]"
+    def toolTipText(self):
+        """Tool tip with title of the submenu.
+
+        Text of the item is used until the submenu is loaded.
+        """
 
-        self.setToolTip(toolTip)
+        toolTip = ""
+        if self.itemModel.tip:
+            toolTip = self.itemModel.tip + " "
+        subMenu = self.itemModel.loaded_sub_menu
+        title = subMenu.main_title.text if subMenu else self.itemModel.text
+        return toolTip + "[Menu: " + title + "]"
 
     def keyPressEvent(self, event):
         """Submenu can also be opened with right arrow key."""
@@ -1066,6 +1647,8 @@ class LauncherViewMenu(QtGui.QMenu):
         QtGui.QMenu.__init__(self, text, parent)
         self.historyMenu = QtGui.QMenu("History", self)
         self.initHistoryMenu()
+        self.processMenu = QtGui.QMenu("Processes", self)
+        self.processMenu.aboutToShow.connect(self.buildProcessMenu)
         self.maxHistoryLength = 10
 
         # When creating menu first time (for the main root menu), a special
@@ -1094,6 +1677,7 @@ class LauncherViewMenu(QtGui.QMenu):
 
         self.addSeparator()
         self.addMenu(self.historyMenu)
+        self.addMenu(self.processMenu)
         self.addSeparator()
 
         searchAction = QtGui.QAction("Search", self)
@@ -1109,6 +1693,28 @@ class LauncherViewMenu(QtGui.QMenu):
         clearHistory.triggered.connect(self.initHistoryMenu)
         self.historyMenu.menuAction().setVisible(False)
 
+    def buildProcessMenu(self):
+        """List running and recently exited launched commands."""
+
+        self.processMenu.clear()
+        process_manager.reap()
+        running, exited = process_manager.processes()
+        self.processMenu.addAction("Running").setEnabled(False)
+        for process in running:
+            text = "{}  {}  ({:.1f} ms)  {}".format(
+                process.pid,
+                time.strftime("%H:%M:%S", time.localtime(process.start_time)),
+                process.latency * 1000, process.cmd)
+            self.processMenu.addAction(text)
+        self.processMenu.addSeparator()
+        self.processMenu.addAction("Exited").setEnabled(False)
+        for process in reversed(exited):
+            text = "{}  {}  [exit code: {}]  {}".format(
+                process.pid,
+                time.strftime("%H:%M:%S", time.localtime(process.end_time)),
+                process.exit_code, process.cmd)
+            self.processMenu.addAction(text).setEnabled(False)
+
     def addToHistory(self, itemModel):
         action = LauncherFileChoiceAction(itemModel, self)
         history_list = self.historyMenu.actions()
@@ -1162,23 +1768,9 @@ class LauncherStyle(object):
             self.appendStyle(style, item)
 
     def appendThemeStyle(self, theme):
-        mainWindow = self.item
-        while type(mainWindow) is not LauncherWindow:
-            mainWindow = mainWindow.parent()
-
-        try:
-            theme_file = open_launcher_file(
-                os.path.join(mainWindow.launcherCfg.get("theme_base"),
-                             theme + ".qss"))
-            self.styleString = self.styleString + theme_file.read().decode('utf-8')
-
-            theme_file.close()
-            self.style = useQLatin1String(self.styleString)
-
-        except IOError:
-            warnMsg = "Theme \"" + theme + \
-                "\" was not found. Theme ignored."
-            logging.warning(warnMsg)
+        registry = LauncherStyleRegistry.forWidget(self.item)
+        self.styleString = self.styleString + registry.themeStyle(theme)
+        self.style = useQLatin1String(self.styleString)
 
     def appendStyle(self, style, item):
         self.styleString = self.styleString + item.__class__.__name__ +\
@@ -1189,9 +1781,115 @@ class LauncherStyle(object):
         self.styleString = self.styleString + style
         self.style = useQLatin1String(self.styleString)
 
+
+class LauncherStyleRegistry(object):
+
+    """Style sheets used in one launcher window.
+
+    Each theme file is read once. Style sheet for a combination of widget
+    class, theme and style is composed once and shared by all such widgets.
+    """
+
+    def __init__(self, themeBase):
+        self.themeBase = themeBase
+        self.themes = dict()
+        self.styles = dict()
+        # Menu arrow indicator. Built here to use right path and avoid
+        # compiling python code
+
+        currDir = os.path.dirname(os.path.realpath(__file__))
+        indicator = os.path.join(currDir, "resources/images/caret-right.png")
+        indicator = os.path.normpath(indicator)
+        # Even on windows a path to the image must be with forward slashes.
+
+        indicator = re.sub(r'\\', '/', indicator)
+        self.indicatorStyle = "LauncherButton:menu-indicator {image: url(" +\
+            indicator + ");subcontrol-position: right center}"
+
+    @staticmethod
+    def forWidget(widget):
+        """Return style registry of the launcher window widget is in."""
+
+        candidate = widget
+        while getattr(candidate, "styleRegistry", None) is None:
+            candidate = candidate.parent()
+        return candidate.styleRegistry
+
+    def themeStyle(self, theme):
+        """Return content of theme file. It is read on first use."""
+
+        themeStyle = self.themes.get(theme)
+        if themeStyle is None:
+            try:
+                themeStyle = read_launcher_file(join_launcher_path(
+                    self.themeBase, theme + ".qss"))[0].decode('utf-8')
+            except IOError:
+                warnMsg = "Theme \"" + theme + \
+                    "\" was not found. Theme ignored."
+                logging.warning(warnMsg)
+                themeStyle = ""
+            self.themes[theme] = themeStyle
+        return themeStyle
+
+    def getStyle(self, item, theme=None, style=None):
+        """Return style sheet for widget item with theme and style."""
+
+        key = (item.__class__.__name__, theme, style)
+        styleSheet = self.styles.get(key)
+        if styleSheet is None:
+            styleSheet = LauncherStyle(item, theme, style).style
+            self.styles[key] = styleSheet
+        return styleSheet
+
+
+def executeCommand(itemModel, parent=None, clickTime=None):
+    """Run command of launcher_cmd_item as a separate process.
+
+    Command is started with arguments split when the item was loaded.
+    Started processes are tracked by process_manager. Command is skipped if
+    it was started less than process_manager.min_interval seconds ago. If
+    item type has reuse set and command is still running, user is informed
+    instead of starting it again. Time from clickTime to the started
+    process is logged (debug) as launch latency.
+    """
+
+    cmd = itemModel.cmd
+    if itemModel.reuse:
+        process = process_manager.running_process(cmd)
+        if process:
+            QtGui.QMessageBox.information(
+                parent, "Already running",
+                "Command \"" + cmd + "\" is already running (PID " +
+                str(process.pid) + ").")
+            return
+
+    try:
+        process = process_manager.launch(cmd, itemModel.argv, clickTime)
+        if process is None:
+            warn_msg = "Command \"" + cmd + "\" was started less than " + \
+                str(process_manager.min_interval) + " s ago. Skipped."
+            logging.warning(warn_msg)
+        else:
+            logging.debug("Command \"%s\" started (PID %d) in %.1f ms.", cmd,
+                          process.pid, process.latency * 1000)
+    except OSError:
+        warn_msg = "Command \"" + cmd + "\" cannot be executed. " + \
+            "Wrong path or bad/no interpreter."
+        logging.warning(warn_msg)
+
+
+def reportStartupProfile():
+    """Print startup profile. Called when first event loop is done."""
+
+    startup_profile.mark("show (event loop)")
+    startup_profile.stop_imports()
+    startup_profile.report()
+
+
 def main():
     """ Main logic """
 
+    startup_profile.mark("imports")
     argsPars = argparse.ArgumentParser()
     argsPars.add_argument('configuration',
                           help="menu/configuration file")
@@ -1201,29 +1899,57 @@ def main():
                           help="overwrite default style (qss file)")
     argsPars.add_argument('--position', type=int, nargs=2, metavar=('X', 'Y'),
                           help="set initial position on the screen")
+    argsPars.add_argument('--lazy', action='store_true',
+                          help="load submenus when they are first opened")
+    argsPars.add_argument('--preload', action='store_true',
+                          help="load submenus in the background once the "
+                               "launcher is shown (implies --lazy)")
+    argsPars.add_argument('--workers', type=int, default=0,
+                          help="number of threads fetching menu files in "
+                               "parallel (default: 0, one after another)")
+    argsPars.add_argument('--cache', nargs='?', const=launcher_cache_dir(),
+                          metavar='DIR',
+                          help="cache parsed menu files (default DIR: " +
+                               launcher_cache_dir() + ")")
+    argsPars.add_argument('--unload-idle', type=int, default=0,
+                          metavar='SECONDS',
+                          help="remove widgets of submenus not used for "
+                               "SECONDS (default: 0, keep them)")
+    argsPars.add_argument('--launch-interval', type=float, default=0,
+                          metavar='SECONDS',
+                          help="do not start the same command again within "
+                               "SECONDS (default: 0, always start)")
+    argsPars.add_argument('--spawner', action='store_true',
+                          help="start commands from a small helper process "
+                               "instead of forking the launcher")
+    argsPars.add_argument('--watch', action='store_true',
+                          help="reload menu files when they are changed")
+    argsPars.add_argument('--profile-startup', action='store_true',
+                          help="print where startup time goes (imports, "
+                               "model, widgets, ...)")
     args = argsPars.parse_args()
+    process_manager.min_interval = args.launch_interval
+    if args.spawner:
+        process_manager.start_spawner()
 
     app = QtGui.QApplication(sys.argv)
+    startup_profile.mark("QApplication")
 
     # Load configuration. Use default configuration defined inside package if
     # --config is not specified
     currDir = os.path.dirname(os.path.realpath(__file__))
     cfgPath = os.path.join(currDir, "resources/mapping/mapping.json")
-    cfgFile = open_launcher_file(cfgPath)
-    cfgString = cfgFile.read(-1).decode('utf-8')
+    cfgString = read_launcher_file(cfgPath)[0].decode('utf-8')
     defaultCfg = json.loads(cfgString)
     defaultCfg["cfg_base"] = os.path.dirname(cfgPath)
-    cfgFile.close()
 
     default = True
     logMsg = ""
     if args.mapping:
         try:
-            cfgFile = open_launcher_file(args.mapping)
-            cfgString = cfgFile.read(-1).decode('utf-8')
+            cfgString = read_launcher_file(args.mapping)[0].decode('utf-8')
             cfg = json.loads(cfgString)
             cfg["cfg_base"] = os.path.dirname(args.mapping)
-            cfgFile.close()
             default = False
         except:
             logMsg = "Problems opening \"" + args.mapping + "\". "
@@ -1232,27 +1958,39 @@ def main():
         cfg = defaultCfg
         logMsg += "Launcher will be loaded with default mapping."
         logging.warning(logMsg)
+    startup_profile.mark("mapping")
 
     # Create Launcher Window and load default style and theme
-    launcherWindow = LauncherWindow(args.configuration, cfg)
+    launcherWindow = LauncherWindow(args.configuration, cfg,
+                                    lazyLoad=args.lazy, preload=args.preload,
+                                    loadWorkers=args.workers,
+                                    cacheDir=args.cache,
+                                    unloadIdle=args.unload_idle,
+                                    watch=args.watch)
+    app.aboutToQuit.connect(launcherWindow.closeMenuModel)
+    app.aboutToQuit.connect(process_manager.close)
 
     app.setStyle("cleanlooks")
-    styleFile = open_launcher_file(os.path.join(currDir,
-                                                "resources/qss/default.qss"))
-    app.setStyleSheet(styleFile.read().decode('utf-8'))
-    styleFile.close()
+    styleData = read_launcher_file(os.path.join(currDir,
+                                                "resources/qss/default.qss"))[0]
+    app.setStyleSheet(styleData.decode('utf-8'))
     if args.style:
         try:
-            userStyle = open_launcher_file(args.style)
-            launcherWindow.setStyleSheet(userStyle.read().decode('utf-8'))
-            userStyle.close()
+            userStyle = read_launcher_file(args.style)[0]
+            launcherWindow.setStyleSheet(userStyle.decode('utf-8'))
         except:
             LogMsg = "Problems opening \"" + args.style + "\". " + \
                 "Launcher will be opened with default style."
             logging.warning(logMsg)
+    startup_profile.mark("style")
 
     launcherWindow.setMinimumWidth(250)
     launcherWindow.show()
+    if args.profile_startup:
+        QtCore.QTimer.singleShot(0, reportStartupProfile)
+    if args.preload:
+        # Start when event loop is running, so window is shown first.
+        QtCore.QTimer.singleShot(0, launcherWindow.preloadMenuModel)
     geometry = launcherWindow.geometry()
 
     # Set to desired position
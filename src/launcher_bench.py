@@ -0,0 +1,264 @@
+#!/usr/bin/env python
+
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+import sys
+if sys.version_info[0] < 3:
+    # Importing future on python 3 only costs startup time.
+    from builtins import *
+    from future import standard_library
+    standard_library.install_aliases()
+
+import os
+import json
+import time
+import argparse
+import platform
+import tempfile
+
+from .launcher_model import *
+
+
+def generate_menu_tree(out_dir, depth, width, items):
+    """Write synthetic menu tree to out_dir. Returns path of the root menu.
+
+    Each menu has a title, items command items (caqtdm panels with repeated
+    tips and themes), a separator, a shell command and (up to depth levels)
+    width submenus, each in its own file.
+    """
+
+    if not os.path.isdir(out_dir):
+        os.makedirs(out_dir)
+
+    menus = [(0, "menu")]
+    while menus:
+        level, name = menus.pop()
+        menu = [{"type": "title", "text": "Section " + name}]
+        for i in range(items):
+            menu.append({"type": "caqtdm", "text": "Panel {} {}".format(name, i),
+                         "panel": "panel_{}_{}.ui".format(name, i),
+                         "macros": "P={},N={}".format(name, i),
+                         "tip": "Panel tip {}".format(i % 10),
+                         "theme": ("green", None)[i % 2]})
+        menu.append({"type": "separator"})
+        menu.append({"type": "cmd", "text": "Command " + name,
+                     "command": "echo " + name})
+        if level < depth:
+            for i in range(width):
+                child = "{}_{}".format(name, i)
+                menu.append({"type": "menu", "text": "Submenu " + child,
+                             "file": child + ".json"})
+                menus.append((level + 1, child))
+
+        menu_file = {"menu-title": {"text": "Menu " + name},
+                     "file-choice": [{"text": "Root", "file": "menu.json"}],
+                     "menu": menu}
+        with open(os.path.join(out_dir, name + ".json"), "w") as f:
+            json.dump(menu_file, f, indent=1)
+
+    return os.path.join(out_dir, "menu.json")
+
+
+def generate_tcl_tree(out_dir, depth, width, items):
+    """Write synthetic TCL menu tree (for convert.py) to out_dir.
+
+    Tree has the same shape as the one of generate_menu_tree(). Some
+    commands are split over lines. Returns path of the root file.
+    """
+
+    if not os.path.isdir(out_dir):
+        os.makedirs(out_dir)
+
+    menus = [(0, "menu")]
+    while menus:
+        level, name = menus.pop()
+        lines = ["# Generated menu " + name,
+                 "{@main-title} {Menu %s}" % name,
+                 "{@FileChoice menu} {Root}",
+                 "{@title} {Section %s}" % name]
+        for i in range(items):
+            if i % 4:
+                lines.append('{caqtdm -macro "P=%s,N=%d" panel_%s_%d.ui} '
+                             '{Panel %s %d} {help_%d.html}'
+                             % (name, i, name, i, name, i, i % 10))
+            else:
+                lines.append('{medm -x -macro "P=%s,N=%d" \\' % (name, i))
+                lines.append('    panel_%s_%d.adl} {Panel %s %d}'
+                             % (name, i, name, i))
+        lines.append("{@separator}")
+        lines.append("{echo %s} {Command %s}" % (name, name))
+        if level < depth:
+            for i in range(width):
+                child = "%s_%d" % (name, i)
+                lines.append("{>launcher %s} {Submenu %s}" % (child, child))
+                menus.append((level + 1, child))
+
+        with open(os.path.join(out_dir, name + ".config"), "w") as f:
+            f.write("\n".join(lines) + "\n")
+
+    return os.path.join(out_dir, "menu.config")
+
+
+def load_mapping(mapping_path=None):
+    """Return mapping (launcher_cfg) of this system, compiled."""
+
+    if not mapping_path:
+        mapping_path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                    "resources", "mapping", "mapping.json")
+    cfg = json.loads(read_launcher_file(mapping_path)[0].decode('utf-8'))
+    system_type = platform.system()
+    if system_type == "Darwin":
+        system_type = "OS_X"
+    return compile_launcher_cfg(cfg.get(system_type))
+
+
+def load_menu_tree(root_path, launcher_cfg, workers=0, cache=None):
+    """Load whole menu tree and return model, stats and total time."""
+
+    launcher_cfg = dict(launcher_cfg)
+    launcher_cfg["launcher_base"] = os.path.dirname(root_path)
+    stats = launcher_load_stats()
+    loader = launcher_menu_loader(False, workers, cache, stats)
+    start = time.time()
+    try:
+        model = launcher_menu_model(None, root_path, 0, launcher_cfg, loader)
+    finally:
+        loader.close()
+    return model, stats, time.time() - start
+
+
+def measure_peak_memory(root_path, launcher_cfg, workers=0):
+    """Return peak memory (bytes) allocated while loading the tree.
+
+    Returns None if tracemalloc is not available (python < 3.4).
+    """
+
+    try:
+        import tracemalloc
+    except ImportError:
+        return None
+
+    tracemalloc.start()
+    try:
+        load_menu_tree(root_path, launcher_cfg, workers)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_report(model, stats, total_time, peak_memory):
+    files = set(stats.io_time) | stats.cached
+    return {
+        "files": len(files),
+        "cached_files": len(stats.cached),
+        "items": model.loaded_item_count(),
+        "total_time": total_time,
+        "io_time": sum(stats.io_time.values()),
+        "parse_time": sum(stats.decode_time.values()),
+        "resolve_time": sum(stats.resolve_time.values()),
+        "peak_memory": peak_memory,
+        "file_io_time": stats.io_time,
+    }
+
+
+def print_report(report, top, out=None):
+    out = out or sys.stdout
+    print("files:          {:10d} ({} from cache)".format(
+        report["files"], report["cached_files"]), file=out)
+    print("items:          {:10d}".format(report["items"]), file=out)
+    for name in ("total", "io", "parse", "resolve"):
+        print("{:<15} {:10.1f} ms".format(
+            name + " time:", report[name + "_time"] * 1000), file=out)
+    if report["peak_memory"] is not None:
+        print("peak memory:    {:10.1f} MB".format(
+            report["peak_memory"] / (1024 * 1024)), file=out)
+
+    file_io_time = sorted(report["file_io_time"].items(),
+                          key=lambda file_time: file_time[1], reverse=True)
+    if top and file_io_time:
+        print("", file=out)
+        print("slowest files (I/O):", file=out)
+        for file_path, io_time in file_io_time[:top]:
+            print("{:10.2f} ms  {}".format(io_time * 1000, file_path),
+                  file=out)
+
+
+def main():
+    """ Load menu tree without GUI and report where time goes. """
+
+    args_pars = argparse.ArgumentParser(
+        description="Load launcher menu tree (without GUI) and report "
+                    "loading times and memory.")
+    args_pars.add_argument('configuration', nargs='?',
+                           help="root menu file (default: generated tree)")
+    args_pars.add_argument('-m', '--mapping',
+                           help='overwrite default mapping file')
+    args_pars.add_argument('--workers', type=int, default=0,
+                           help="number of threads fetching menu files in "
+                                "parallel (default: 0)")
+    args_pars.add_argument('--cache', nargs='?', const=launcher_cache_dir(),
+                           metavar='DIR',
+                           help="use menu cache (default DIR: " +
+                                launcher_cache_dir() + ")")
+    args_pars.add_argument('-r', '--repeat', type=int, default=1,
+                           help="load tree REPEAT times, report fastest")
+    args_pars.add_argument('--top', type=int, default=10,
+                           help="number of slowest files to list")
+    args_pars.add_argument('--no-memory', action='store_true',
+                           help="do not measure peak memory (extra load)")
+    args_pars.add_argument('--json', action='store_true',
+                           help="print report as JSON")
+    args_pars.add_argument('--generate', type=int, nargs=3,
+                           metavar=('DEPTH', 'WIDTH', 'ITEMS'),
+                           help="generate menu tree (DEPTH levels of WIDTH "
+                                "submenus with ITEMS items each) and load it")
+    args_pars.add_argument('--output', metavar='DIR',
+                           help="directory for generated tree (default: "
+                                "temporary directory)")
+    args = args_pars.parse_args()
+
+    root_path = args.configuration
+    if args.generate:
+        out_dir = args.output or tempfile.mkdtemp(prefix="pylauncher-bench-")
+        root_path = generate_menu_tree(out_dir, *args.generate)
+        if not args.json:
+            print("generated tree: " + root_path)
+    elif not root_path:
+        args_pars.error("configuration or --generate is required")
+    if not is_launcher_url(root_path):
+        root_path = os.path.abspath(root_path)
+
+    launcher_cfg = load_mapping(args.mapping)
+    cache = None
+    if args.cache:
+        cache = launcher_menu_cache(args.cache, launcher_cfg)
+
+    best = None
+    for i in range(max(args.repeat, 1)):
+        result = load_menu_tree(root_path, launcher_cfg, args.workers, cache)
+        if best is None or result[2] < best[2]:
+            best = result
+
+    peak_memory = None
+    if not args.no_memory:
+        peak_memory = measure_peak_memory(root_path, launcher_cfg,
+                                          args.workers)
+
+    report = bench_report(best[0], best[1], best[2], peak_memory)
+    report["configuration"] = root_path
+    report["workers"] = args.workers
+    if args.json:
+        print(json.dumps(report, indent=2, sort_keys=True))
+    else:
+        print_report(report, args.top)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,10 +2,13 @@ from __future__ import unicode_literals
 from __future__ import print_function
 from __future__ import division
 from __future__ import absolute_import
-from builtins import *
-from future import standard_library
-standard_library.install_aliases()
-from builtins import object
+import sys
+if sys.version_info[0] < 3:
+    # Importing future on python 3 only costs startup time.
+    from builtins import *
+    from future import standard_library
+    standard_library.install_aliases()
+    from builtins import object
 #!/usr/bin/env python
 
 #
@@ -13,40 +16,642 @@ from builtins import object
 # but WITHOUT ANY WARRANTY; without even the implied warranty of
 # MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
 
-import sys
 import os
 import json
-import urllib.request, urllib.error, urllib.parse
+import hashlib
+import pickle
+import shlex
+import urllib.parse
 import logging
-import pyparsing
+import threading
+import time
+
+def intern_launcher_string(value):
+    """Return shared copy of value (value itself if seen first time).
+
+    Strings repeated in many items (themes, styles, tips) are interned, so
+    each distinct value is stored once. Interned strings are freed when no
+    item uses them any more. Other values (None, numbers) are returned as
+    they are. Python 2 interns only byte strings, so nothing is shared there.
+    """
+    if sys.version_info[0] < 3 or not isinstance(value, str):
+        return value
+    return sys.intern(value)
+
+
+# Resolved paths for each (base, file) pair. Resolution is pure string
+# manipulation, so results can be shared by all menus in the session.
+_resolved_paths = dict()
+
+
+# Url schemes of menu files. Other paths (also relative ones like
+# "name:rest" and Windows drive letters like C:\\menus) are file paths.
+launcher_url_schemes = ("http", "https", "file")
+
+
+def is_launcher_url(path):
+    """Return True if path is an url, False if it is a file system path.
+
+    Decision is made only from the syntax of the path (no file is opened).
+    """
+    return urllib.parse.urlparse(path).scheme.lower() in launcher_url_schemes
+
 
 def join_launcher_path(base, file):
     # In case file is absolute path ora full url, base will be ignored
     try:
-        urllib.request.urlopen(file)
+        return _resolved_paths[(base, file)]
+    except KeyError:
+        pass
+
+    if is_launcher_url(file):
         joined_path = file
+    elif is_launcher_url(base):
+        # Base is a directory, but urljoin would otherwise replace its last
+        # part with the file name.
+        joined_path = urllib.parse.urljoin(base.rstrip("/") + "/", file)
+    else:
+        joined_path = os.path.join(base, file)
+
+    _resolved_paths[(base, file)] = joined_path
+    return joined_path
 
-    except (urllib.error.URLError, ValueError):
-        try:
-            urllib.request.urlopen(base)
-            urllib.parse.urljoin(base, file)
-        except (urllib.error.URLError, ValueError):
-            joined_path = os.path.join(base, file)
 
-    return joined_path
+def launcher_path_key(path):
+    """Return normalized path, equal for all paths of the same file."""
+    if is_launcher_url(path):
+        return path  # urljoin already resolved "..", "."
+    return os.path.normpath(os.path.abspath(path))
+
+
+def launcher_file_url(file_path):
+    """Return url of the launcher file (file:// url for local files)."""
+    if is_launcher_url(file_path):
+        return file_path
+
+    launcher_file_path = os.path.normpath(file_path)
+    launcher_file_path = os.path.abspath(launcher_file_path)
+    return 'file:///' + launcher_file_path
+
+
+def launcher_file_exists(file_path):
+    """Check if launcher file exists without reading it.
+
+    Local files are only checked on the file system. Urls must be opened.
+    """
+    if not is_launcher_url(file_path):
+        return os.path.isfile(file_path)
 
-def open_launcher_file(file_path):
-    launcher_file = None
     try:
-        launcher_file = urllib.request.urlopen(file_path)
-    except (urllib.error.URLError, ValueError):
-        # Change path to url style and try to open it
-        launcher_file_path = os.path.normpath(file_path)
-        launcher_file_path = os.path.abspath(launcher_file_path)
-        launcher_file_path = 'file:///' + launcher_file_path
-        launcher_file = urllib.request.urlopen(launcher_file_path)
+        open_launcher_file(file_path).close()
+    except IOError:
+        return False
+    return True
+
+
+def open_launcher_file(file_path):
+    # urllib.request is slow to import and is not needed for local files.
+    import urllib.request
+    return urllib.request.urlopen(launcher_file_url(file_path))
+
+
+def read_launcher_file(file_path):
+    """Read launcher file and return its content (bytes) and its url.
+
+    File is read at once and closed right away. Local files are read
+    directly and not through urllib. Raises IOError if file can not be read.
+    """
+    if is_launcher_url(file_path):
+        launcher_file = open_launcher_file(file_path)
+        try:
+            data = launcher_file.read()
+        finally:
+            launcher_file.close()
+    else:
+        with open(file_path, 'rb') as launcher_file:
+            data = launcher_file.read()
+
+    return data, launcher_file_url(file_path)
+
+
+# Menus converted from TCL configurations (.config files) by url and hash of
+# the content. Each file is converted once per session (again only if it
+# changes).
+_tcl_menus = dict()
+_tcl_menu_model = None
+
+
+def is_tcl_menu(menu_url):
+    """Return True if menu_url is a TCL configuration (.config file)."""
+    path = urllib.parse.urlparse(menu_url).path
+    return os.path.splitext(path)[1] == ".config"
+
+
+def tcl_menu_model():
+    """Return menu model of the converter (convert.py), which collects its
+    messages instead of printing them.
+
+    The converter is imported when the first TCL configuration is loaded.
+    """
+    global _tcl_menu_model
+    if _tcl_menu_model is None:
+        from .convert import convert
+
+        class launcher_tcl_menu(convert.LauncherMenuModel):
+
+            def __init__(self, messages, *args, **kwargs):
+                self.messages = messages
+                convert.LauncherMenuModel.__init__(self, *args, **kwargs)
+
+            def report(self, message):
+                self.messages.append(message)
+
+        _tcl_menu_model = launcher_tcl_menu
+    return _tcl_menu_model
+
+
+def decode_tcl_menu(menu_data, menu_url):
+    """Return menu converted from TCL configuration (content menu_data).
+
+    The menu is the same as the JSON menu written by convert.py, except that
+    submenus and file choices reference .config files, so the whole tree is
+    loaded without conversion. Raises ValueError if the configuration can
+    not be parsed.
+    """
+    key = (menu_url, hashlib.sha1(menu_data).hexdigest())
+    menu = _tcl_menus.get(key)
+    if menu is None:
+        # Lines are split the same as when the file is read by the converter.
+        lines = menu_data.decode('ISO-8859-1').splitlines(True)
+        dir_url, _, file_name = menu_url.rpartition("/")
+        messages = list()
+        try:
+            tcl_menu = tcl_menu_model()(messages, dir_url, file_name, True,
+                                        extension=".config", lines=lines)
+        except SystemExit:
+            errors = [message for message in messages
+                      if not message.startswith("Inf:")]
+            raise ValueError("In file \"" + menu_url + "\": " +
+                             " ".join(errors))
+
+        for message in messages:
+            if not message.startswith("Inf:"):
+                warn_msg = "Parser: " + menu_url + ": " + message
+                logging.warning(warn_msg)
+
+        menu = dict(tcl_menu.json_config)
+        menu["menu"] = tcl_menu.menu_items
+        _tcl_menus[key] = menu
+
+    # Model stores resolved commands in items, which depend on the mapping.
+    menu = dict(menu)
+    menu["menu"] = [dict(item) for item in menu["menu"]]
+    return menu
+
+
+def launcher_cmd_placeholders(command):
+    """Return names of placeholders ({name}) in the command.
+
+    Name is the first word inside each top level pair of braces, nested
+    braces are part of the placeholder. Text after an unmatched closing
+    brace is ignored. Raises ValueError if a brace is not closed or a
+    placeholder has no name.
+    """
+    placeholders = list()
+    depth = 0
+    start = 0
+    for i, char in enumerate(command):
+        if char == "{":
+            depth += 1
+            if depth == 1:
+                start = i + 1
+        elif char == "}":
+            if depth == 0:
+                break
+            depth -= 1
+            if depth == 0:
+                name = command[start:i].split(None, 1)
+                name = name[0].split("{", 1)[0] if name else ""
+                if not name:
+                    raise ValueError("Placeholder without name in command \"" +
+                                     command + "\".")
+                placeholders.append(name)
+
+    if depth > 0:
+        raise ValueError("Brace not closed in command \"" + command + "\".")
+    return placeholders
+
+
+def compile_launcher_cfg(launcher_cfg):
+    """Return copy of launcher_cfg with item types compiled to templates.
+
+    Each item type definition (dictionary with command) is replaced with
+    launcher_cmd_template, other settings (e.g. theme_base) are copied.
+    """
+    compiled_cfg = dict()
+    for key, value in launcher_cfg.items():
+        if isinstance(value, dict) and "command" in value:
+            value = launcher_cmd_template(value)
+        compiled_cfg[key] = value
+    return compiled_cfg
+
+
+def launcher_cache_dir():
+    """Return default directory of the menu cache (~/.cache/pylauncher)."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or \
+        os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "pylauncher")
+
+
+class launcher_menu_cache(object):
+
+    """Persistent cache of decoded and resolved menu files.
+
+    For each menu file the cache holds the decoded menu, in which the model
+    also stores resolved commands of items (see launcher_cmd_item), and a
+    stamp of the file: modification time and size for local files and hash
+    of the content for urls. A cached menu is used only while the stamp of
+    its file is unchanged, so a changed file invalidates only its own menu,
+    its submenus are still taken from the cache.
+
+    Resolved commands depend on the mapping, so each mapping has its own
+    cache file in cache_dir.
+
+    Entries whose file changed are removed when looked up. Entries not used
+    for max_age seconds and cache files (of other mappings) not written for
+    max_age seconds are removed when the cache is saved.
+
+    Entries are looked up and stored from worker threads and reloads while
+    another thread can save the cache, so all of them hold lock.
+    """
+
+    version = 3
+    max_age = 30 * 24 * 3600
+    # Last use of an entry is updated at most this often, so the cache file
+    # is not written on every start only to record it.
+    use_interval = 24 * 3600
+
+    def __init__(self, cache_dir, launcher_cfg):
+        types = dict()
+        for key, value in launcher_cfg.items():
+            if isinstance(value, launcher_cmd_template):
+                types[key] = value.cfg
+            elif isinstance(value, dict):
+                types[key] = value
+        digest = hashlib.sha1(json.dumps(types, sort_keys=True).encode(
+            'utf-8')).hexdigest()
+        self.cache_dir = cache_dir
+        self.path = os.path.join(cache_dir, "menus-" + digest + ".pickle")
+        self.modified = False
+        self.entries = dict()  # file_path: (stamp, menu, last use)
+        self.lock = threading.RLock()
+
+        try:
+            with open(self.path, 'rb') as cache_file:
+                cache = pickle.load(cache_file)
+            if cache.get("version") == launcher_menu_cache.version:
+                self.entries = cache["entries"]
+        except IOError:
+            pass  # No cache yet
+        except Exception as e:
+            warn_msg = "Menu cache \"" + self.path + "\" can not be " + \
+                "read (" + str(e) + "). Ignored."
+            logging.warning(warn_msg)
+
+    def lookup(self, file_path, stamp):
+        """Return cached menu if its stamp is the same, otherwise None.
+
+        Entry with a different stamp is stale and is removed.
+        """
+        with self.lock:
+            entry = self.entries.get(file_path)
+            if entry is None:
+                return None
+            if entry[0] != stamp:
+                del self.entries[file_path]
+                self.modified = True
+                return None
+
+            now = time.time()
+            if now - entry[2] > launcher_menu_cache.use_interval:
+                self.entries[file_path] = (entry[0], entry[1], now)
+                self.modified = True
+            return entry[1]
+
+    def store(self, file_path, stamp, menu):
+        with self.lock:
+            self.entries[file_path] = (stamp, menu, time.time())
+            self.modified = True
+
+    def prune(self):
+        """Remove entries and cache files not used for max_age seconds."""
+        limit = time.time() - launcher_menu_cache.max_age
+        with self.lock:
+            for file_path, entry in list(self.entries.items()):
+                if entry[2] < limit:
+                    del self.entries[file_path]
+                    self.modified = True
+
+        try:
+            file_names = os.listdir(self.cache_dir)
+        except OSError:
+            return  # No cache directory yet
+        for file_name in file_names:
+            path = os.path.join(self.cache_dir, file_name)
+            if file_name.startswith("menus-") and path != self.path:
+                try:
+                    if os.path.getmtime(path) < limit:
+                        os.remove(path)
+                except OSError:
+                    pass  # Removed or used by another launcher
+
+    def save(self):
+        """Prune the cache and write it if anything was changed."""
+        with self.lock:
+            self.prune()
+            if not self.modified:
+                return
+
+            try:
+                if not os.path.isdir(self.cache_dir):
+                    os.makedirs(self.cache_dir)
+                # Write to a temporary file and replace the old cache with
+                # it, so other launchers never read a half written cache.
+                tmp_path = self.path + "." + str(os.getpid())
+                with open(tmp_path, 'wb') as cache_file:
+                    pickle.dump({"version": launcher_menu_cache.version,
+                                 "entries": self.entries}, cache_file, 2)
+                if os.name == 'nt' and os.path.exists(self.path):
+                    os.remove(self.path)
+                os.rename(tmp_path, self.path)
+                self.modified = False
+            except (IOError, OSError) as e:
+                warn_msg = "Menu cache \"" + self.path + "\" can not be " + \
+                    "written (" + str(e) + ")."
+                logging.warning(warn_msg)
+
+
+class launcher_load_stats(object):
+
+    """Where time goes when a menu tree is loaded (see launcher_bench).
+
+    For each file (by path) holds time spent reading it (io_time), decoding
+    JSON (decode_time) and building its model items (resolve_time, without
+    loading of its submenus). Files taken from the menu cache are in cached.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.io_time = dict()
+        self.decode_time = dict()
+        self.resolve_time = dict()
+        self.cached = set()
+        self._nested = threading.local()
+
+    def add(self, times, file_path, duration):
+        with self.lock:
+            times[file_path] = times.get(file_path, 0) + duration
+
+    def start_model(self):
+        """Start timing of a model. Returns start time for stop_model()."""
+        stack = getattr(self._nested, "stack", None)
+        if stack is None:
+            stack = self._nested.stack = list()
+        stack.append(0.0)  # Time of nested models (submenus)
+        return time.time()
+
+    def stop_model(self, file_path, start, load_time):
+        duration = time.time() - start
+        stack = self._nested.stack
+        nested = stack.pop()
+        if stack:
+            stack[-1] += duration
+        self.add(self.resolve_time, file_path, duration - nested - load_time)
+
+
+class launcher_menu_loader(object):
+
+    """Loads menu files of one menu tree.
+
+    All launcher_menu_model objects of the same tree share one loader. If
+    lazy is True, each submenu is parsed the first time it is accessed
+    (launcher_sub_menu_item.sub_menu), otherwise the whole tree is parsed
+    when the root menu is created.
+
+    If workers > 0, files are prefetched on a pool of worker threads. As soon
+    as a file is decoded, files referenced from it (menu items and
+    file-choices) are fetched in parallel. Models are still built in the
+    calling thread and in the same order as without prefetching, so the
+    resulting tree is the same.
+
+    If cache (launcher_menu_cache) is given, files which did not change are
+    taken from it instead of being read and decoded. If stats
+    (launcher_load_stats) is given, loading times are recorded to it.
+
+    Each menu file is parsed once per tree. Models of parsed files are kept
+    in models (by launcher_path_key) and shared by all submenu
+    items referencing the same file. References that would include a file
+    into itself (include cycles) are found with includes().
+    """
+
+    def __init__(self, lazy=False, workers=0, cache=None, stats=None):
+        self.lazy = lazy
+        self.workers = workers
+        self.cache = cache
+        self.stats = stats
+        # Submenus can be loaded from the preload thread and the GUI thread
+        # at the same time.
+        self.lock = threading.RLock()
+
+        self.pool = None
+        self.fetch_lock = threading.Lock()
+        self.fetched = dict()  # file_path: AsyncResult of _fetch_menu
+        self.checked = dict()  # file_path: AsyncResult of exists check
+        self.prefetched = set()
+        self.models = dict()  # path key: launcher_menu_model
+
+    def load(self, file_path):
+        """Return decoded menu file and its url.
+
+        Raises IOError if file can not be read and ValueError if it is not
+        a valid JSON file.
+        """
+        if not self.lazy:
+            self.prefetch(file_path)
+
+        with self.fetch_lock:
+            fetched = self.fetched.pop(file_path, None)
 
-    return launcher_file
+        if fetched:
+            return fetched.get()
+        return self._read_menu(file_path)
+
+    def reload(self, file_path):
+        """Return decoded menu file, read again (see load())."""
+        with self.fetch_lock:
+            self.fetched.pop(file_path, None)
+        return self._read_menu(file_path)
+
+    def exists(self, file_path):
+        with self.fetch_lock:
+            checked = self.checked.pop(file_path, None)
+
+        if checked:
+            return checked.get()
+        return launcher_file_exists(file_path)
+
+    def decode(self, menu_data, menu_url):
+        """Return decoded menu file.
+
+        Resolved commands of items (see launcher_cmd_item) are trusted only
+        when they come from the cache, so they are removed from the file.
+        """
+        if is_tcl_menu(menu_url):
+            menu = decode_tcl_menu(menu_data, menu_url)
+        else:
+            try:
+                menu = json.loads(menu_data.decode('utf-8'))
+            except Exception as e:
+                raise ValueError("In file \"" + menu_url + "\": " +
+                                 e.args[0])
+
+        items = menu.get("menu") if isinstance(menu, dict) else None
+        if isinstance(items, list):
+            for item in items:
+                if isinstance(item, dict):
+                    for key in launcher_cmd_item.resolved_keys:
+                        item.pop(key, None)
+        return menu
+
+    def prefetch(self, file_path):
+        """Start fetching file and all files it references (recursively)."""
+        if self.workers <= 0:
+            return
+
+        with self.fetch_lock:
+            if self.pool is None:
+                from multiprocessing.pool import ThreadPool
+                self.pool = ThreadPool(self.workers)
+            if file_path not in self.prefetched and \
+                    launcher_path_key(file_path) not in self.models:
+                self.prefetched.add(file_path)
+                self.fetched[file_path] = self.pool.apply_async(
+                    self._fetch_menu, (file_path,))
+
+    def close(self):
+        """Stop worker threads, drop files that were not used and save cache.
+        """
+        with self.fetch_lock:
+            if self.pool is not None:
+                self.pool.terminate()
+                self.pool = None
+            self.fetched.clear()
+            self.checked.clear()
+            self.prefetched.clear()
+
+        if self.cache is not None:
+            with self.lock:
+                self.cache.save()
+
+    def _read_menu(self, file_path):
+        stamp = None
+        if self.cache is not None and not is_launcher_url(file_path):
+            try:
+                stat = os.stat(file_path)
+                stamp = (stat.st_mtime, stat.st_size)
+            except OSError:
+                pass  # Reported when file is read
+            menu = self.cache.lookup(file_path, stamp)
+            if menu is not None:
+                if self.stats is not None:
+                    self.stats.cached.add(file_path)
+                return menu, launcher_file_url(file_path)
+
+        start = time.time()
+        menu_data, menu_url = read_launcher_file(file_path)
+        if self.stats is not None:
+            self.stats.add(self.stats.io_time, file_path, time.time() - start)
+        if self.cache is not None and stamp is None:
+            # Remote file. Only decoding and resolving can be saved.
+            stamp = hashlib.sha1(menu_data).hexdigest()
+            menu = self.cache.lookup(file_path, stamp)
+            if menu is not None:
+                if self.stats is not None:
+                    self.stats.cached.add(file_path)
+                return menu, menu_url
+
+        start = time.time()
+        menu = self.decode(menu_data, menu_url)
+        if self.stats is not None:
+            self.stats.add(self.stats.decode_time, file_path,
+                           time.time() - start)
+        if self.cache is not None:
+            self.cache.store(file_path, stamp, menu)
+        return menu, menu_url
+
+    def _fetch_menu(self, file_path):
+        # Runs in a worker thread.
+        menu, menu_url = self._read_menu(file_path)
+
+        base = os.path.dirname(file_path)
+        try:
+            for item in menu.get("menu", list()):
+                if item.get("type") == "menu":
+                    self.prefetch(join_launcher_path(base,
+                                                     item["file"].strip()))
+            for view in menu.get("file-choice", list()):
+                self._check(join_launcher_path(base, view["file"].strip()))
+        except (AttributeError, KeyError, TypeError):
+            pass  # Format errors are reported when the model is built.
+
+        return menu, menu_url
+
+    def _check(self, file_path):
+        with self.fetch_lock:
+            if self.pool is not None and file_path not in self.checked:
+                self.checked[file_path] = self.pool.apply_async(
+                    launcher_file_exists, (file_path,))
+
+    def includes(self, file_path, file_paths):
+        """Return True if file_path is or includes any of file_paths.
+
+        file_paths is a set of path keys (launcher_path_key). Only submenus
+        of already parsed files are followed.
+        """
+        visited = set()
+        paths = [launcher_path_key(file_path)]
+        while paths:
+            path = paths.pop()
+            if path in file_paths:
+                return True
+            menu = self.models.get(path)
+            if path in visited or menu is None:
+                continue
+            visited.add(path)
+            for item in menu.menu_items:
+                if isinstance(item, launcher_sub_menu_item):
+                    paths.append(launcher_path_key(item.file_path))
+        return False
+
+    def preload(self, menu):
+        """Load all submenus of the menu that were not loaded yet."""
+        menus = [menu]
+        visited = set()
+        while menus:
+            menu = menus.pop()
+            if id(menu) in visited:
+                continue  # Shared submenu
+            visited.add(id(menu))
+            for item in menu.menu_items:
+                if isinstance(item, launcher_sub_menu_item) and \
+                        item._sub_menu is None:
+                    self.prefetch(item.file_path)
+            for item in menu.menu_items:
+                if isinstance(item, launcher_sub_menu_item):
+                    sub_menu = item.load_sub_menu()
+                    if sub_menu is not None:
+                        menus.append(sub_menu)
+        self.close()
 
 
 class launcher_menu_model(object):
@@ -64,41 +669,86 @@ class launcher_menu_model(object):
         main_title: holding the title of the menu
         level: holding the level of the menu (main = 0, sub of main = 1, ...)
         list of menu_items: list of all launcher_menu_model_items
+
+    A menu file referenced from several menus is parsed once and its model
+    is shared (see launcher_menu_loader). parent and level of the model are
+    then those of the first reference. Each referencing submenu item holds
+    level and trace of its own reference, so trace of an item reached
+    through any of them is known (launcher_menu_model_item.trace_through).
+
+    When the menu file changes, reload() rebuilds the items of the model in
+    place, so menus and items referencing the model stay valid.
     """
 
-    def __init__(self, parent, menu_file_path, level, launcher_cfg):
+    def __init__(self, parent, menu_file_path, level, launcher_cfg,
+                 loader=None):
         self.menu_items = list()
         self.parent = parent
         self.level = level
         self.menu_path = menu_file_path
+        self.launcher_cfg = launcher_cfg
+        self.loader = loader or launcher_menu_loader()
+        stats = self.loader.stats
+        if stats is not None:
+            start = stats.start_model()
 
-        # open file
-        menu_file = open_launcher_file(menu_file_path)
-        self.parse_menu_json(menu_file, launcher_cfg)
-        menu_file.close()
-
-    def parse_menu_json(self, menu_file, launcher_cfg):
-        """Parse JSON type menu config file."""
-
+        # read file
         try:
-            menu = json.loads(menu_file.read().decode('utf-8'))
-        except Exception as e:
-            err_msg = ("In file \"" + menu_file.geturl() + "\": " + e.args[0])
-            logging.error(err_msg)
+            menu, menu_url = self.loader.load(menu_file_path)
+        except ValueError as e:
+            logging.error(e.args[0])
             sys.exit()
+        except IOError:
+            if stats is not None:
+                stats.stop_model(menu_file_path, start, time.time() - start)
+            raise
+
+        if stats is not None:
+            load_time = time.time() - start
+        self.parse_menu_json(menu, menu_url, launcher_cfg)
+        if stats is not None:
+            stats.stop_model(menu_file_path, start, load_time)
+
+    @classmethod
+    def empty(cls, parent):
+        """Return menu without items in place of submenu of parent item.
+
+        Used by views when the submenu file of parent
+        (launcher_sub_menu_item) can not be loaded.
+        """
+        menu = cls.__new__(cls)
+        menu.menu_items = list()
+        menu.parent = parent
+        menu.level = parent.level
+        menu.menu_path = parent.file_path
+        menu.launcher_cfg = parent.launcher_cfg
+        menu.loader = parent.parent.loader
+        menu.main_title = launcher_main_title_item(dict(), parent.text)
+        menu.choice_element = launcher_file_choice_item(
+            menu, {"text": parent.text, "file": parent.file_path})
+        menu.file_choices = list()
+        return menu
+
+    def parse_menu_json(self, menu, menu_url, launcher_cfg):
+        """Parse decoded JSON type menu config file.
+
+        Items are built into new lists, which replace those of the menu
+        only when the whole file is parsed. Other threads (filter, search)
+        see either the previous or the new items, never a partly built menu.
+        """
 
         main_title_item = menu.get("menu-title", dict())
-        self.main_title = launcher_main_title_item(
+        main_title = launcher_main_title_item(
             main_title_item,
-            os.path.splitext(os.path.basename(menu_file.geturl()))[0])
+            os.path.splitext(os.path.basename(menu_url))[0])
 
         # Create file choice element that represents this menu
-        self.choice_element = launcher_file_choice_item(
-                self, {"text": self.main_title.text, "file": menu_file.geturl()})
+        choice_element = launcher_file_choice_item(
+                self, {"text": main_title.text, "file": menu_url})
         # Get list of possible views (e.g. expert, user)
 
         list_of_views = menu.get("file-choice", list())
-        self.file_choices = list()
+        file_choices = list()
         for view in list_of_views:
             self.check_item_format_json(view, "file-choice", ["text", "file"])
             # Do not open file just check if exists. Will be opened, in
@@ -107,21 +757,19 @@ class launcher_menu_model(object):
             file_name = view.get("file").strip()
             file_path = join_launcher_path(os.path.dirname(self.menu_path),
                                            file_name)
-            try:
-                choice_file = open_launcher_file(file_path)
-                choice_file.close()
-                self.file_choices.append(launcher_file_choice_item(
-                    self, view))
-            except IOError:
-                warn_msg = "Parser: " + menu_file.geturl() + ": File \"" +\
+            if self.loader.exists(file_path):
+                file_choices.append(launcher_file_choice_item(self, view))
+            else:
+                warn_msg = "Parser: " + menu_url + ": File \"" +\
                     file_name + "\" not found. Skipped"
                 logging.warning(warn_msg)
 
         # Build menu model. Report error if menu is not defined.
 
         list_of_menu_items = menu.get("menu", list())
+        menu_items = list()
         if not list_of_menu_items:
-            err_msg = "Parser: " + menu_file.geturl() +\
+            err_msg = "Parser: " + menu_url +\
                 ": Launcher menu is empty."
             logging.error(err_msg)
             sys.exit()
@@ -139,7 +787,18 @@ class launcher_menu_model(object):
                 item_cfg = launcher_cfg.get(item_type)
                 # self.check_item_format_json(item, item_type,
                 #                            ["text", "params"])
-                menu_item = launcher_cmd_item(self, item_cfg, item)
+                try:
+                    menu_item = launcher_cmd_item(self, item_cfg, item)
+                except ValueError as e:
+                    # Command template if command could not be formatted.
+                    command = item.get("_command") or \
+                        getattr(item_cfg, "command", None) or \
+                        item_cfg.get("command", "")
+                    warn_msg = "Parser: " + menu_url + ": Item \"" + \
+                        str(item.get("text")) + "\": Command \"" + \
+                        command + "\" is malformed (" + str(e) + \
+                        "). Skipped"
+                    logging.warning(warn_msg)
 
             elif item_type == "menu":
                 self.check_item_format_json(item, item_type, ["text", "file"])
@@ -147,10 +806,14 @@ class launcher_menu_model(object):
                     menu_item = launcher_sub_menu_item(self, launcher_cfg,
                                                        item)
                 except IOError:
-                    warn_msg = "Parser: " + menu_file.geturl() + \
+                    warn_msg = "Parser: " + menu_url + \
                         ": File \"" + item.get("file") + "\" not found. " + \
                         "Skipped"
                     logging.warning(warn_msg)
+                except launcher_include_cycle as e:
+                    warn_msg = "Parser: " + menu_url + ": " + e.args[0] + \
+                        " Skipped"
+                    logging.warning(warn_msg)
 
             elif item_type == "title":
                 self.check_item_format_json(item, item_type, ["text"])
@@ -160,12 +823,64 @@ class launcher_menu_model(object):
                 menu_item = launcher_item_separator(self, item)
 
             else:
-                warn_msg = "Parser:" + menu_file.geturl() + \
+                warn_msg = "Parser:" + menu_url + \
                     ": Unknown type \"" + item_type + "\". Skipped"
                 logging.warning(warn_msg)
 
             if menu_item != None:
-                self.menu_items.append(menu_item)
+                menu_items.append(menu_item)
+
+        (self.main_title, self.choice_element, self.file_choices,
+         self.menu_items) = (main_title, choice_element, file_choices,
+                             menu_items)
+
+    def reload(self):
+        """Read the menu file again and rebuild items of this menu.
+
+        Models of submenus that are still referenced are kept (shared
+        through the loader), new submenus are loaded as usual. If the file
+        cannot be read or is not a valid menu, the model is not changed and
+        False is returned.
+        """
+        try:
+            menu, menu_url = self.loader.reload(self.menu_path)
+        except (IOError, ValueError) as e:
+            warn_msg = "Parser: " + self.menu_path + ": Menu can not be " + \
+                "reloaded (" + str(e) + "). Skipped"
+            logging.warning(warn_msg)
+            return False
+
+        try:
+            with self.loader.lock:
+                self.parse_menu_json(menu, menu_url, self.launcher_cfg)
+        except SystemExit:
+            # Error is already reported. Menu is not changed.
+            return False
+        return True
+
+    def loaded_menus(self):
+        """Return this menu and its loaded submenus (shared ones once)."""
+        menus = [self]
+        loaded = list()
+        visited = set()
+        while menus:
+            menu = menus.pop()
+            if id(menu) in visited:
+                continue
+            visited.add(id(menu))
+            loaded.append(menu)
+            for item in menu.menu_items:
+                if isinstance(item, launcher_sub_menu_item) and \
+                        item._sub_menu is not None:
+                    menus.append(item._sub_menu)
+        return loaded
+
+    def loaded_item_count(self):
+        """Return number of items in this menu and its loaded submenus.
+
+        Items of shared submenus are counted once.
+        """
+        return sum(len(menu.menu_items) for menu in self.loaded_menus())
 
     def check_item_format_json(self, item, item_name, mandatory_param):
         """Check dictionary for mandatory keys.
@@ -182,8 +897,12 @@ class launcher_menu_model(object):
                 sys.exit()
 
     def __repr__(self):
+        return self.tree_repr(self.level)
+
+    def tree_repr(self, level):
+        """Return repr of the menu as reached on the given level."""
         s = "{} (nelm: {})\n".format(self.main_title, len(self.menu_items))
-        tabs = "\t" *self.level
+        tabs = "\t" *level
         strings = map(repr,self.menu_items)
         strings = [tabs + str for str in strings]
         s += "\n".join(strings)
@@ -196,27 +915,43 @@ class launcher_menu_model_item(object):
     launcher_menu_model_item is a parent super class for menu items that needs
     to be visualized, such as menu buttons, separators, titles. It implements
     methods and parameters common to many subclasses.
+
+    Trees can have many items, so items have no __dict__ (__slots__) and
+    repeated strings (tip, theme, style, help link) are interned.
     """
 
+    __slots__ = ("parent", "text", "help_link", "tip", "theme", "style")
+
     def __init__(self, parent, item):
         self.parent = parent
         self.text = item.get("text", None)
-        self.help_link = item.get("help-link", None)
-        self.tip = item.get("tip", "").strip()
-        self.theme = item.get("theme", None)
-        self.style = item.get("style", None)
-        # Track history of menus to reach this item in the tree. Every item has
-        # a parent which is menu, and each menu that is not root menu, has a
-        # parent which is submenu item. This list contains trace of submenu
-        # items to reach this item.
-
-        if parent:
-            if parent.__class__.__name__ == "launcher_menu_model" and\
-                    parent.parent.__class__.__name__ == "launcher_sub_menu_item":
-                self.trace = list(parent.parent.trace)
-                self.trace.append(parent.parent)
-            else:
-                self.trace = list()
+        self.help_link = intern_launcher_string(item.get("help-link", None))
+        self.tip = intern_launcher_string(item.get("tip", "").strip())
+        self.theme = intern_launcher_string(item.get("theme", None))
+        self.style = intern_launcher_string(item.get("style", None))
+
+    @property
+    def trace(self):
+        """Return list of submenu items to reach this item in the tree.
+
+        Menu of the item is reached through its first reference (see
+        trace_through).
+        """
+        menu = self.parent
+        if menu.__class__.__name__ != "launcher_menu_model":
+            return list()
+        return self.trace_through(menu.parent)
+
+    def trace_through(self, reference):
+        """Return trace of this item when its menu is reached through
+        reference (launcher_sub_menu_item of the menu, None for root menu).
+
+        Each submenu item holds the trace of its own reference, so items of
+        a shared menu have a trace for each menu referencing it.
+        """
+        if reference.__class__.__name__ != "launcher_sub_menu_item":
+            return list()
+        return list(reference.references)
 
     def __repr__(self):
         return "{}: {}".format(self.__class__.__name__, self.text)
@@ -225,6 +960,8 @@ class launcher_main_title_item(launcher_menu_model_item):
 
     """ Holds description of main menu button. """
 
+    __slots__ = ()
+
     def __init__(self, item, file_name):
         launcher_menu_model_item.__init__(self, None, item)
         if not self.text:
@@ -235,30 +972,80 @@ class launcher_item_separator(launcher_menu_model_item):
 
     """Special launcher_menu_model_item, with no text, style or help."""
 
+    __slots__ = ()
+
     def __init__(self, parent, item):
         launcher_menu_model_item.__init__(self, parent, item)
 
 
-class launcher_cmd_item(launcher_menu_model_item):
+class launcher_cmd_template(object):
 
-    """ launcher_cmd_item holds the whole shell command."""
+    """Command template of one item type defined in the mapping.
 
-    def __init__(self, parent, item_cfg, item):
-        launcher_menu_model_item.__init__(self, parent, item)
-        self.cmd = item_cfg.get("command")
-        arg_flags = item_cfg.get("arg_flags", dict())
-        expr = pyparsing.nestedExpr('{', '}', ignoreExpr=None)
-        args = expr.parseString("{" + self.cmd + "}")
+    Placeholders ({name}) of the command are found once, when the template
+    is created. Commands of items are then built with substitute().
+    If reuse is True, a command of this type should not be started again
+    while it is still running.
+    """
+
+    def __init__(self, item_cfg):
+        self.cfg = item_cfg
+        self.command = item_cfg.get("command")
+        self.arg_flags = item_cfg.get("arg_flags", dict())
+        self.reuse = bool(item_cfg.get("reuse", False))
+        self.placeholders = launcher_cmd_placeholders(self.command)
 
+    def substitute(self, item):
+        """Return command with placeholders replaced by item parameters.
+
+        Raises ValueError if command can not be formatted (e.g. indexed
+        placeholder or unsupported format specification).
+        """
         params = dict()
-        for arg in args[0]:
-            
-            arg = arg[0]
+        for arg in self.placeholders:
             if item.get(arg):
-                params[arg] = arg_flags.get(arg, "") + " " + item.get(arg)
+                params[arg] = self.arg_flags.get(arg, "") + " " + item.get(arg)
             else:
                 params[arg] = ""
-        self.cmd = self.cmd.format(**params)
+        try:
+            return self.command.format(**params)
+        except (KeyError, IndexError, AttributeError, ValueError) as e:
+            raise ValueError("Placeholders can not be formatted: " +
+                             e.__class__.__name__ + ": " + str(e))
+
+
+class launcher_cmd_item(launcher_menu_model_item):
+
+    """ launcher_cmd_item holds the whole shell command.
+
+    item_cfg is launcher_cmd_template of the item type (or its definition
+    from the mapping). Resolved command and its arguments (argv, as split
+    by shlex) are stored back to the item ("_command", "_argv"), so they are
+    kept in the menu cache together with the item. Loader removes these
+    keys from items read from menu files. Raises ValueError if command
+    cannot be split (e.g. unclosed quotation).
+    """
+
+    __slots__ = ("reuse", "cmd", "argv")
+    resolved_keys = ("_command", "_argv")
+
+    def __init__(self, parent, item_cfg, item):
+        launcher_menu_model_item.__init__(self, parent, item)
+        if not isinstance(item_cfg, launcher_cmd_template):
+            item_cfg = launcher_cmd_template(item_cfg)
+        self.reuse = item_cfg.reuse
+        self.cmd = item.get("_command")
+        if self.cmd is None:
+            self.cmd = item_cfg.substitute(item)
+            item["_command"] = self.cmd
+        self.argv = item.get("_argv")
+        if self.argv is None:
+            self.argv = shlex.split(self.cmd)
+            item["_argv"] = self.argv
+
+
+class launcher_include_cycle(Exception):
+    pass
 
 
 class launcher_sub_menu_item(launcher_menu_model_item):
@@ -266,23 +1053,101 @@ class launcher_sub_menu_item(launcher_menu_model_item):
     """Menu item with reference to submenu model.
 
     launcher_sub_menu_item builds new menu which is defined in sub_menu_file.
+    If loader of the parent menu is lazy, the submenu is built on first access
+    of sub_menu, otherwise right away. Model of a file that was already
+    parsed in the same tree is shared.
+
+    Raises launcher_include_cycle if the submenu file includes the menu in
+    which the item is defined (directly or through other submenus).
     If detach == True this sub-menu should be automatically detached if
     detachment is supported in view (TODO).
     """
 
+    __slots__ = ("file_path", "launcher_cfg", "_sub_menu", "references")
+
     def __init__(self, parent, launcher_cfg, item):
 
         launcher_menu_model_item.__init__(self, parent, item)
         file_name = item.get("file").strip()
+        # Submenu items from the root menu to (and with) this one.
+        self.references = tuple(self.trace) + (self,)
 
         # relative paths to the menu file where this item is defined
-        file_path = join_launcher_path(os.path.dirname(parent.menu_path), file_name)
-
-        self.sub_menu = launcher_menu_model(self, file_path,
-                                            parent.level+1, launcher_cfg)
+        self.file_path = join_launcher_path(os.path.dirname(parent.menu_path),
+                                            file_name)
+        self.launcher_cfg = launcher_cfg
+        self._sub_menu = None
+
+        # Files of menus on the path to this item. Submenus of those being
+        # parsed are not in loader.models yet, so they are checked directly.
+        including_paths = set()
+        menu = parent
+        while menu is not None:
+            including_paths.add(launcher_path_key(menu.menu_path))
+            menu = menu.parent.parent if menu.parent else None
+        with parent.loader.lock:
+            if parent.loader.includes(self.file_path, including_paths):
+                raise launcher_include_cycle(
+                    "Menu \"" + file_name + "\" includes this menu " +
+                    "(include cycle).")
+
+        if not parent.loader.lazy:
+            self._sub_menu = self._build_sub_menu()
+        elif not parent.loader.exists(self.file_path):
+            # Report missing file while parsing, same as when not lazy.
+            raise IOError("File \"" + self.file_path + "\" not found.")
+
+    @property
+    def level(self):
+        """Level of the submenu when reached through this item."""
+        return len(self.references)
+
+    @property
+    def sub_menu(self):
+        if self._sub_menu is None:
+            with self.parent.loader.lock:
+                if self._sub_menu is None:
+                    self._sub_menu = self._build_sub_menu()
+        return self._sub_menu
+
+    @property
+    def loaded_sub_menu(self):
+        """Return sub_menu if it is already loaded, otherwise None."""
+        return self._sub_menu
+
+    def load_sub_menu(self):
+        """Return sub_menu, or None if its file can not be loaded.
+
+        Lazy submenus are loaded from GUI slots and background threads,
+        where an invalid file must not exit the launcher. Error is logged
+        and loading is tried again on next call.
+        """
+        try:
+            return self.sub_menu
+        except (SystemExit, IOError, ValueError) as e:
+            err_msg = "Parser: " + self.file_path + \
+                ": Menu can not be loaded"
+            if not isinstance(e, SystemExit):
+                # Reason of exit is already logged by the parser.
+                err_msg += " (" + str(e) + ")"
+            logging.error(err_msg + ". Skipped")
+            return None
+
+    def _build_sub_menu(self):
+        loader = self.parent.loader
+        key = launcher_path_key(self.file_path)
+        with loader.lock:
+            sub_menu = loader.models.get(key)
+            if sub_menu is None:
+                sub_menu = launcher_menu_model(self, self.file_path,
+                                               self.level,
+                                               self.launcher_cfg, loader)
+                loader.models[key] = sub_menu
+        return sub_menu
 
     def __repr__(self):
-        return repr(launcher_menu_model_item.__repr__(self))+" : "+repr(self.sub_menu)
+        return repr(launcher_menu_model_item.__repr__(self)) + " : " + \
+            self.sub_menu.tree_repr(self.level)
 
 
 class launcher_file_choice_item(launcher_menu_model_item):
@@ -294,6 +1159,8 @@ class launcher_file_choice_item(launcher_menu_model_item):
     (root_menu_file).
     """
 
+    __slots__ = ("root_menu_file",)
+
     def __init__(self, parent, item):
         launcher_menu_model_item.__init__(self, parent, item)
         self.root_menu_file = item.get("file").strip()
@@ -303,5 +1170,7 @@ class launcher_title_item(launcher_menu_model_item):
 
     """Text menu separator."""
 
+    __slots__ = ()
+
     def __init__(self, parent, item):
         launcher_menu_model_item.__init__(self, parent, item)
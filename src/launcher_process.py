@@ -0,0 +1,297 @@
+#!/usr/bin/env python
+
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+import sys
+if sys.version_info[0] < 3:
+    # Importing future on python 3 only costs startup time.
+    from builtins import *
+    from future import standard_library
+    standard_library.install_aliases()
+    from builtins import object
+
+import os
+import json
+import collections
+import logging
+import shlex
+import subprocess
+import threading
+import time
+
+
+class launcher_process(object):
+
+    """Command started by the launcher.
+
+    Holds pid, command text, start time and (when process exits) end time
+    and exit code. latency is time from the click (launch request) to the
+    known pid of the process. popen is None if process was started by the
+    spawner.
+    """
+
+    def __init__(self, cmd, pid, popen=None, latency=None):
+        self.cmd = cmd
+        self.pid = pid
+        self.popen = popen
+        self.start_time = time.time()
+        self.latency = latency
+        self.end_time = None
+        self.exit_code = None
+
+    def __repr__(self):
+        return "{}: {} {}".format(self.__class__.__name__, self.pid, self.cmd)
+
+
+class launcher_spawner_error(Exception):
+    pass
+
+
+class launcher_spawner(object):
+
+    """Start commands from the spawner helper process (launcher_spawner.py).
+
+    Helper is small, so starting a command from it is faster than forking
+    the launcher. Requests and replies are JSON lines (see the helper).
+    Replies and exit events are read in a thread; on_exit(pid, exit_code)
+    is called from it for each exited process.
+    """
+
+    def __init__(self, on_exit, timeout=5):
+        self.on_exit = on_exit
+        self.timeout = timeout
+        helper = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              "launcher_spawner.py")
+        # Protocol has its own pipes. Commands started by the helper get
+        # /dev/null as stdin and stdout/stderr of the launcher, so they
+        # cannot read requests or write into replies.
+        request_read, request_write = os.pipe()
+        reply_read, reply_write = os.pipe()
+        if sys.version_info[0] < 3:
+            fds = dict(close_fds=False)
+        else:
+            fds = dict(pass_fds=(request_read, reply_write))
+        with open(os.devnull, "rb") as devnull:
+            # -S: helper needs no site packages, start it as small as
+            # possible.
+            self.helper = subprocess.Popen(
+                [sys.executable, "-S", helper, str(request_read),
+                 str(reply_write)], stdin=devnull, **fds)
+        os.close(request_read)
+        os.close(reply_write)
+        self.requests = os.fdopen(request_write, "wb")
+        self.replies_pipe = os.fdopen(reply_read, "rb")
+        self.lock = threading.Lock()
+        self.reply_ready = threading.Condition(self.lock)
+        self.replies = dict()  # request id: reply
+        self.next_id = 0
+        self.alive = True
+        self.reader = threading.Thread(target=self._read)
+        self.reader.daemon = True
+        self.reader.start()
+
+    def spawn(self, argv, env=None):
+        """Start argv with env (launcher environment if None). Return pid.
+
+        Raises OSError if command cannot be executed and
+        launcher_spawner_error if helper is not running or does not reply
+        in timeout seconds (helper is stopped then).
+        """
+        request = {"argv": list(argv),
+                   "env": dict(os.environ if env is None else env)}
+        with self.lock:
+            if not self.alive:
+                raise launcher_spawner_error("Spawner is not running.")
+            self.next_id += 1
+            request_id = request["id"] = self.next_id
+            try:
+                self.requests.write(
+                    (json.dumps(request) + "\n").encode("utf-8"))
+                self.requests.flush()
+            except (IOError, OSError, ValueError):
+                raise launcher_spawner_error("Spawner is not running.")
+
+            deadline = time.time() + self.timeout
+            while request_id not in self.replies and self.alive:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    self._stop()
+                    raise launcher_spawner_error("Spawner did not reply.")
+                self.reply_ready.wait(remaining)
+            reply = self.replies.pop(request_id, None)
+
+        if reply is None:
+            raise launcher_spawner_error("Spawner is not running.")
+        if "error" in reply:
+            raise OSError(reply.get("errno"), reply["error"])
+        return reply["pid"]
+
+    def _read(self):
+        try:
+            for line in iter(self.replies_pipe.readline, b""):
+                try:
+                    message = json.loads(line.decode("utf-8"))
+                    if "id" in message:
+                        with self.lock:
+                            self.replies[message["id"]] = message
+                            self.reply_ready.notify_all()
+                    else:
+                        self.on_exit(message["pid"], message["exit_code"])
+                except (ValueError, TypeError, KeyError):
+                    logging.warning("Invalid message from spawner: {}"
+                                    .format(line))
+        finally:
+            with self.lock:
+                self.alive = False
+                self.reply_ready.notify_all()
+
+    def _stop(self):
+        """Mark helper as stopped and close its requests (lock is held)."""
+        self.alive = False
+        self.reply_ready.notify_all()
+        try:
+            self.requests.close()
+        except (IOError, OSError):
+            pass
+
+    def close(self):
+        """Stop the helper. Started processes are left running."""
+        with self.lock:
+            self._stop()
+        self.helper.wait()
+
+
+class launcher_process_manager(object):
+
+    """Start commands and keep track of them until they exit.
+
+    Exited processes are collected with reap(), which must be called
+    periodically (launcher does it with a timer). Last history_length
+    exited processes are kept in history.
+
+    Same command is not started again if it was started less than
+    min_interval seconds ago (e.g. double click on a heavy panel).
+
+    After start_spawner() commands are started by the spawner helper
+    process instead of forking the launcher.
+    """
+
+    def __init__(self, min_interval=0, history_length=50):
+        self.min_interval = min_interval
+        self.lock = threading.Lock()
+        self.running = collections.OrderedDict()  # pid: launcher_process
+        self.history = collections.deque(maxlen=history_length)
+        self.last_start = dict()  # cmd: start time
+        self.spawner = None
+        self.early_exits = dict()  # pid: exit code (reported before start)
+
+    def start_spawner(self):
+        """Start commands with spawner helper from now on (only on posix)."""
+        if os.name != "posix":
+            logging.warning("Spawner is supported only on posix systems. "
+                            "Commands are started directly.")
+            return
+        self.spawner = launcher_spawner(self.process_exited)
+
+    def close(self):
+        if self.spawner is not None:
+            self.spawner.close()
+            self.spawner = None
+
+    def launch(self, cmd, argv=None, request_time=None):
+        """Start cmd (split to argv if not given) as a separate process.
+
+        Returns launcher_process, or None if launch was throttled. Raises
+        OSError if command cannot be executed. request_time (e.g. time of
+        the click) is used to measure launch latency.
+        """
+        now = time.time()
+        with self.lock:
+            last_start = self.last_start.get(cmd)
+            if last_start is not None and now - last_start < self.min_interval:
+                return None
+            self.last_start[cmd] = now
+
+        try:
+            if argv is None:
+                argv = shlex.split(cmd)
+            pid, popen = self._start(argv)
+        except (OSError, ValueError):
+            # Failed start does not throttle the next try.
+            with self.lock:
+                if self.last_start.get(cmd) == now:
+                    del self.last_start[cmd]
+            raise
+        process = launcher_process(cmd, pid, popen,
+                                   time.time() - (request_time or now))
+        with self.lock:
+            process.exit_code = self.early_exits.pop(pid, None)
+            self.running[pid] = process
+        self.reap()
+        return process
+
+    def _start(self, argv):
+        """Start argv. Return pid and Popen (None if started by spawner)."""
+        if self.spawner is not None:
+            try:
+                return self.spawner.spawn(argv), None
+            except launcher_spawner_error as e:
+                logging.warning("{} Commands are started directly."
+                                .format(e))
+                self.spawner = None
+        popen = subprocess.Popen(argv)
+        return popen.pid, popen
+
+    def process_exited(self, pid, exit_code):
+        """Record exit code of process started by the spawner."""
+        with self.lock:
+            process = self.running.get(pid)
+            if process is not None:
+                process.exit_code = exit_code
+            else:
+                self.early_exits[pid] = exit_code
+
+    def running_process(self, cmd):
+        """Return running process started with cmd, or None."""
+        self.reap()
+        with self.lock:
+            for process in self.running.values():
+                if process.cmd == cmd:
+                    return process
+        return None
+
+    def reap(self):
+        """Collect exited processes. Returns list of them."""
+        exited = list()
+        with self.lock:
+            for process in list(self.running.values()):
+                if process.popen is not None:
+                    process.exit_code = process.popen.poll()
+                if process.exit_code is not None:
+                    process.end_time = time.time()
+                    process.popen = None
+                    del self.running[process.pid]
+                    self.history.append(process)
+                    exited.append(process)
+
+            # Throttling needs only recent starts.
+            limit = time.time() - self.min_interval
+            for cmd, start in list(self.last_start.items()):
+                if start < limit:
+                    del self.last_start[cmd]
+        return exited
+
+    def processes(self):
+        """Return running processes (oldest first) and exited ones."""
+        with self.lock:
+            return list(self.running.values()), list(self.history)
+
+
+process_manager = launcher_process_manager()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+
+# Kept free of any imports that are not needed, because it is imported before
+# everything else when startup is profiled.
+from __future__ import print_function
+from __future__ import division
+import sys
+import time
+
+if sys.version_info[0] < 3:
+    import __builtin__ as builtins
+else:
+    import builtins
+
+
+class launcher_startup_profile(object):
+
+    """Measure where launcher startup time goes.
+
+    When started, imports of all modules that were not imported yet are
+    timed (self and cumulative time, similar to python -X importtime). Other
+    startup phases are recorded with mark(), which does nothing if profile
+    was not started.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.start_time = None
+        self.imports = list()  # (depth, name, self time, cumulative time)
+        self.phases = list()  # (phase, time since previous mark)
+        self._last_mark = None
+        self._depth = 0
+        self._children_time = [0.0]
+        self._import = None
+
+    def start(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        self.start_time = time.time()
+        self._last_mark = self.start_time
+        self._import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def stop_imports(self):
+        """Stop timing imports."""
+        if self._import is not None:
+            builtins.__import__ = self._import
+            self._import = None
+
+    def mark(self, phase):
+        """Record time since previous mark as duration of phase."""
+        if not self.enabled:
+            return
+        now = time.time()
+        self.phases.append((phase, now - self._last_mark))
+        self._last_mark = now
+
+    def _timed_import(self, name, *args, **kwargs):
+        module_name = name
+        level = args[3] if len(args) > 3 else kwargs.get("level", 0)
+        if level:
+            # Relative import. Get absolute name from the importing package.
+            import_globals = args[0] if args else kwargs.get("globals")
+            package = (import_globals or dict()).get("__package__") or ""
+            package = package.rsplit(".", level - 1)[0]
+            module_name = package + "." + name if name else package
+
+        if module_name in sys.modules:
+            return self._import(name, *args, **kwargs)
+
+        index = len(self.imports)
+        self.imports.append(None)  # Keep order in which imports started
+        self._depth += 1
+        self._children_time.append(0.0)
+        start = time.time()
+        try:
+            return self._import(name, *args, **kwargs)
+        finally:
+            cumulative = time.time() - start
+            children = self._children_time.pop()
+            self._depth -= 1
+            self._children_time[-1] += cumulative
+            self.imports[index] = (self._depth, module_name,
+                                   cumulative - children, cumulative)
+
+    def report(self, out=None):
+        """Print import times and startup phases (in milliseconds)."""
+        out = out or sys.stderr
+        print("import time: self [ms] | cumulative | imported package",
+              file=out)
+        for depth, name, self_time, cumulative in self.imports:
+            print("import time: %9.1f | %10.1f | %s%s" % (
+                self_time * 1000, cumulative * 1000, "  " * depth, name),
+                file=out)
+
+        print("", file=out)
+        print("startup phase           time [ms]", file=out)
+        for phase, duration in self.phases:
+            print("%-24s %9.1f" % (phase, duration * 1000), file=out)
+        print("%-24s %9.1f" % ("total", (self._last_mark - self.start_time) *
+                               1000), file=out)
+
+
+startup_profile = launcher_startup_profile()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+
+from __future__ import unicode_literals
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+import sys
+if sys.version_info[0] < 3:
+    # Importing future on python 3 only costs startup time.
+    from builtins import *
+    from future import standard_library
+    standard_library.install_aliases()
+    from builtins import object
+
+import threading
+
+from .launcher_model import launcher_cmd_item, launcher_sub_menu_item
+
+
+def trigrams(text):
+    """Return set of all 3 character substrings of text."""
+    return set(text[i:i+3] for i in range(len(text) - 2))
+
+
+class launcher_search_index(object):
+
+    """Search index over command items of a menu tree.
+
+    Index is built from the launcher_menu_model tree (all submenus are
+    loaded, those that can not be loaded are skipped). For text and command
+    of each command item it holds the lower case string and a trigram index
+    (trigram: set of entries), so only entries that contain all trigrams of
+    the search term must be checked.
+
+    Each entry also holds the submenu items (ancestors) that lead to the item,
+    so menus that must stay visible are known without walking the tree.
+
+    When search term extends the previous one (with same options), only
+    results of previous search are checked.
+
+    Index can be built and searched from any thread.
+    """
+
+    build_lock = threading.Lock()
+
+    def __init__(self, menu):
+        self.menu = menu
+        self.items = list()
+        self.ancestors = list()
+        self.fields = {"text": list(), "cmd": list()}
+        self.index = {"text": dict(), "cmd": dict()}
+        self.last_search = (None, None)  # (query, matching entries)
+
+        menus = [(menu, ())]
+        while menus:
+            menu, ancestors = menus.pop()
+            for item in menu.menu_items:
+                if isinstance(item, launcher_cmd_item):
+                    self.add_item(item, ancestors)
+                elif isinstance(item, launcher_sub_menu_item):
+                    sub_menu = item.load_sub_menu()
+                    if sub_menu is not None:
+                        menus.append((sub_menu, ancestors + (item,)))
+
+    @classmethod
+    def for_menu(cls, menu):
+        """Return index of the menu tree. Index is built on first use."""
+        with cls.build_lock:
+            index = getattr(menu, "search_index", None)
+            if index is None:
+                index = cls(menu)
+                menu.search_index = index
+        return index
+
+    @classmethod
+    def invalidate(cls, menus):
+        """Drop indexes of menus. They are built again on next use."""
+        with cls.build_lock:
+            for menu in menus:
+                menu.search_index = None
+
+    def add_item(self, item, ancestors):
+        entry = len(self.items)
+        self.items.append(item)
+        self.ancestors.append(ancestors)
+        for field, value in (("text", item.text), ("cmd", item.cmd)):
+            value = value or ""
+            self.fields[field].append((value, value.lower()))
+            field_index = self.index[field]
+            for trigram in trigrams(value.lower()):
+                field_index.setdefault(trigram, set()).add(entry)
+
+    def search(self, term, case_sensitive=False, text=True, cmd=False,
+               cancelled=None):
+        """Search term in text and/or command of items.
+
+        Returns set of matching items and set of submenu items that lead to
+        them (must be visible to reach matching items). Search is stopped
+        and None returned as soon as cancelled() returns True.
+        """
+        fields = [field for field, enabled in (("text", text), ("cmd", cmd))
+                  if enabled]
+        query = (term, case_sensitive, tuple(fields))
+        entries = self.find_entries(query, cancelled)
+        if entries is None:
+            return None
+        self.last_search = (query, entries)
+
+        items = set()
+        menus = set()
+        for entry in entries:
+            items.add(self.items[entry])
+            menus.update(self.ancestors[entry])
+        return items, menus
+
+    def find_entries(self, query, cancelled=None):
+        term, case_sensitive, fields = query
+        if not term or not fields:
+            return list()
+
+        last_query, last_entries = self.last_search
+        if last_query and last_query[1:] == query[1:] and \
+                last_query[0] in term:
+            # Narrow down previous result.
+            candidates = last_entries
+        else:
+            candidates = self.candidates(term.lower(), fields)
+
+        lower_term = term.lower()
+        entries = list()
+        for i, entry in enumerate(candidates):
+            if cancelled and not i % 1000 and cancelled():
+                return None
+            for field in fields:
+                value, lower_value = self.fields[field][entry]
+                if (term in value) if case_sensitive else \
+                        (lower_term in lower_value):
+                    entries.append(entry)
+                    break
+        return entries
+
+    def candidates(self, term, fields):
+        """Return entries which contain all trigrams of the term."""
+        term_trigrams = trigrams(term)
+        if not term_trigrams:
+            return range(len(self.items))
+
+        candidates = set()
+        for field in fields:
+            field_index = self.index[field]
+            postings = [field_index.get(trigram, set())
+                        for trigram in term_trigrams]
+            postings.sort(key=len)
+            candidates.update(postings[0].intersection(*postings[1:]))
+        return sorted(candidates)
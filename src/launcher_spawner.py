@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+
+# Spawner helper of the launcher (see launcher_process.launcher_spawner).
+#
+# Started once with the launcher and kept small, so starting a command does
+# not need to fork the whole launcher process. Runs as a standalone script,
+# so it imports only what it needs. Reads requests (one JSON object per
+# line) from the request pipe (fd given as first argument):
+#
+#     {"id": 1, "argv": ["caqtdm", "panel.ui"], "env": {"PATH": ...}}
+#
+# and writes replies and exit events to the reply pipe (second argument):
+#
+#     {"id": 1, "pid": 1234}
+#     {"id": 1, "error": "No such file or directory", "errno": 2}
+#     {"pid": 1234, "exit_code": 0}
+#
+# Protocol uses its own pipes, so started commands get stdin, stdout and
+# stderr of the helper (/dev/null and those of the launcher) and cannot
+# read requests or write into replies. Helper exits when the request pipe
+# is closed. Processes still running then are left running.
+
+import os
+import sys
+import json
+import select
+import fcntl
+
+
+def spawn(argv, env):
+    if hasattr(os, "posix_spawnp"):
+        return os.posix_spawnp(argv[0], argv, env)
+
+    pid = os.fork()  # Cheap, this process is small.
+    if pid == 0:
+        try:
+            os.execvpe(argv[0], argv, env)
+        finally:
+            os._exit(127)
+    return pid
+
+
+def write_message(reply_fd, message):
+    os.write(reply_fd, (json.dumps(message) + "\n").encode("utf-8"))
+
+
+def set_cloexec(fd):
+    """Do not pass fd to started commands."""
+    flags = fcntl.fcntl(fd, fcntl.F_GETFD)
+    fcntl.fcntl(fd, fcntl.F_SETFD, flags | fcntl.FD_CLOEXEC)
+
+
+def handle_request(reply_fd, line):
+    request = json.loads(line.decode("utf-8"))
+    env = request.get("env")
+    if env is None:
+        env = os.environ
+    try:
+        pid = spawn(request["argv"], env)
+        write_message(reply_fd, {"id": request["id"], "pid": pid})
+    except OSError as e:
+        write_message(reply_fd, {"id": request["id"],
+                                 "error": e.strerror or str(e),
+                                 "errno": e.errno})
+
+
+def reap(reply_fd):
+    """Report all exited children."""
+    while True:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except OSError:
+            return  # No children
+        if pid == 0:
+            return
+        if os.WIFSIGNALED(status):
+            exit_code = -os.WTERMSIG(status)
+        else:
+            exit_code = os.WEXITSTATUS(status)
+        write_message(reply_fd, {"pid": pid, "exit_code": exit_code})
+
+
+def main():
+    request_fd, reply_fd = int(sys.argv[1]), int(sys.argv[2])
+    set_cloexec(request_fd)
+    set_cloexec(reply_fd)
+    data = b""
+    while True:
+        ready = select.select([request_fd], [], [], 0.5)[0]
+        if ready:
+            chunk = os.read(request_fd, 65536)
+            if not chunk:
+                break
+            data += chunk
+            while b"\n" in data:
+                line, data = data.split(b"\n", 1)
+                if line.strip():
+                    handle_request(reply_fd, line)
+        reap(reply_fd)
+    reap(reply_fd)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
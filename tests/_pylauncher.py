@@ -0,0 +1,26 @@
+# Import modules of pylauncher for tests.
+#
+# Installed package is used if available, otherwise the package is loaded
+# from the src/ directory of this repository (installed as pylauncher).
+
+import os
+import sys
+import importlib
+import importlib.util
+
+
+def pylauncher_module(name):
+    """Return pylauncher.<name> module."""
+    try:
+        import pylauncher
+    except ImportError:
+        src_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               os.pardir, "src")
+        spec = importlib.util.spec_from_file_location(
+            "pylauncher", os.path.join(src_dir, "__init__.py"),
+            submodule_search_locations=[src_dir])
+        pylauncher = importlib.util.module_from_spec(spec)
+        sys.modules["pylauncher"] = pylauncher
+        spec.loader.exec_module(pylauncher)
+
+    return importlib.import_module("pylauncher." + name)
@@ -0,0 +1,147 @@
+# Differential test of launcher_cmd_placeholders.
+#
+# Placeholders of mapping commands, edge cases and random commands must be
+# found as by pyparsing.nestedExpr, which the launcher used before (same
+# names, or both fail). Commands built from them must be the same.
+#
+# Run with: python -m unittest discover tests (or python -m pytest tests)
+
+import os
+import sys
+import json
+import random
+import unittest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, TESTS_DIR)
+from _pylauncher import pylauncher_module
+
+launcher_model = pylauncher_module("launcher_model")
+
+try:
+    import pyparsing
+except ImportError:
+    pyparsing = None
+
+MAPPING_PATH = os.path.join(TESTS_DIR, os.pardir, "src", "resources",
+                            "mapping", "mapping.json")
+
+EDGE_CASES = [
+    'caqtdm {param} {macros} {panel}',
+    'bash -c "{command}"',
+    '{a}{b}',
+    '{ spaced  } {tab\tname}',
+    '{a b}',
+    '{a{b}} {c {d} e}',
+    '{{nested} first}',
+    '{}',
+    '{a}} rest is ignored {b}',
+    '} {a}',
+    '{unclosed',
+    '{a} {unclosed',
+    'no placeholders',
+    '',
+    '"{quoted}" \'{single}\'',
+    '{a.b} {a[0]} {a!r} {a:>5}',
+]
+
+ITEM = {"param": "-x", "macros": "P=A,N=1", "panel": "panel.ui",
+        "command": "echo hello", "a": "A", "b": "B", "c": "C"}
+
+RANDOM_CHARS = 'ab {}{}""x. '
+
+
+def mapping_commands():
+    with open(MAPPING_PATH) as mapping_file:
+        mapping = json.load(mapping_file)
+    return [(value["command"], value.get("arg_flags", dict()))
+            for system in mapping.values()
+            for value in system.values()
+            if isinstance(value, dict) and "command" in value]
+
+
+def random_commands(n, seed=1):
+    generator = random.Random(seed)
+    return ["".join(generator.choice(RANDOM_CHARS)
+                    for i in range(generator.randint(0, 15)))
+            for j in range(n)]
+
+
+def pyparsing_tokens(command):
+    """Top level tokens of the command as parsed by the launcher before."""
+    expr = pyparsing.nestedExpr('{', '}', ignoreExpr=None)
+    return expr.parseString("{" + command + "}")[0]
+
+
+def pyparsing_placeholders(command):
+    # Words outside of braces also gave (single character) arguments, which
+    # were never used by format. Only placeholders are compared.
+    return [token[0] for token in pyparsing_tokens(command)
+            if not isinstance(token, str)]
+
+
+def pyparsing_substitute(command, arg_flags, item):
+    """Command built as by the launcher with pyparsing."""
+    params = dict()
+    for token in pyparsing_tokens(command):
+        arg = token[0]
+        if item.get(arg):
+            params[arg] = arg_flags.get(arg, "") + " " + item.get(arg)
+        else:
+            params[arg] = ""
+    return command.format(**params)
+
+
+def template_substitute(command, arg_flags, item):
+    template = launcher_model.launcher_cmd_template(
+        {"command": command, "arg_flags": arg_flags})
+    return template.substitute(item)
+
+
+def result(function, *args):
+    try:
+        placeholders = function(*args)
+    except Exception:
+        return "failed"
+    # Placeholder found by pyparsing can be nested (not a name).
+    if isinstance(placeholders, list) and \
+            not all(isinstance(name, str) for name in placeholders):
+        return "failed"
+    return placeholders
+
+
+@unittest.skipIf(pyparsing is None, "pyparsing is not installed")
+class TestPlaceholders(unittest.TestCase):
+
+    def assertSamePlaceholders(self, commands):
+        for command in commands:
+            self.assertEqual(
+                result(launcher_model.launcher_cmd_placeholders, command),
+                result(pyparsing_placeholders, command),
+                "Command %r" % command)
+
+    def assertSameCommand(self, commands, arg_flags=None):
+        arg_flags = arg_flags or {"macros": "-macro", "panel": "-f"}
+        for command in commands:
+            self.assertEqual(
+                result(template_substitute, command, arg_flags, ITEM),
+                result(pyparsing_substitute, command, arg_flags, ITEM),
+                "Command %r" % command)
+
+    def test_mapping(self):
+        for command, arg_flags in mapping_commands():
+            self.assertSamePlaceholders([command])
+            self.assertSameCommand([command], arg_flags)
+
+    def test_edge_cases(self):
+        self.assertSamePlaceholders(EDGE_CASES)
+        self.assertSameCommand(EDGE_CASES)
+
+    def test_random_commands(self):
+        commands = random_commands(2000)
+        self.assertSamePlaceholders(commands)
+        self.assertSameCommand(commands)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+# Differential test of the convert.py line tokenizers.
+#
+# Lines of the TCL configurations in fixtures/convert, of a generated menu
+# tree, edge cases and random lines must be split by split_tcl_line exactly
+# as by pyparsing.nestedExpr (same result, or both fail). Fixture files must
+# also be converted to the same menus with both tokenizers.
+#
+# Run with: python -m unittest discover tests (or python -m pytest tests)
+
+import os
+import sys
+import random
+import shutil
+import tempfile
+import unittest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, TESTS_DIR)
+from _pylauncher import pylauncher_module
+
+convert = pylauncher_module("convert.convert")
+launcher_bench = pylauncher_module("launcher_bench")
+
+try:
+    import pyparsing
+except ImportError:
+    pyparsing = None
+
+FIXTURES_DIR = os.path.join(TESTS_DIR, "fixtures", "convert")
+
+EDGE_CASES = [
+    '{@main-title} {Main menu}',
+    '{caqtdm -macro "P=A,N=1" panel.ui} {Panel 1} {help.html}',
+    '{caqtdm -macro "a b"x panel.ui} {x"y"z}',
+    '{echo "a""b" \'c\'\'d\'} {Quotes}',
+    '{echo "a\\"b" "c\\x41" "d\\xq"} {Escapes}',
+    "{echo Bob's panel} {Bob's}",
+    '{echo "unclosed} {text}',
+    '{echo \'unclosed} {text}',
+    '{echo "{not a group}"} {Braces in quotes}',
+    '{a{b}c} {{{deep} nested} x}',
+    '{a}} {rest is ignored}',
+    '{a} {b}}c}',
+    '{missing close} {x',
+    '  {leading white space}  {x}',
+    '{tabs\tinside}\t{"a\tb"}',
+    '{vertical\x0bwhite\x0cspace\xa0chars} {x}',
+    '{}',
+    '{@separator}',
+    '{>launcher sub} {Submenu} {obj: x}',
+    '# {comment}',
+]
+
+RANDOM_CHARS = 'ab {}{}""\'\'\\x1\t'
+
+
+def fixture_files():
+    return sorted(os.path.join(FIXTURES_DIR, file_name)
+                  for file_name in os.listdir(FIXTURES_DIR)
+                  if file_name.endswith(".config"))
+
+
+def config_lines(file_paths):
+    """Return logical lines (without comments) of TCL configurations."""
+    lines = list()
+    for file_path in file_paths:
+        for line_number, line, comment in convert.read_tcl_lines(file_path):
+            if not comment:
+                lines.append(line)
+    return lines
+
+
+def random_lines(n, seed=1):
+    generator = random.Random(seed)
+    return ["".join(generator.choice(RANDOM_CHARS)
+                    for i in range(generator.randint(0, 20)))
+            for j in range(n)]
+
+
+def split_result(split, line):
+    try:
+        return split(line)
+    except Exception:
+        return "failed"
+
+
+@unittest.skipIf(pyparsing is None, "pyparsing is not installed")
+class TestTokenizer(unittest.TestCase):
+
+    def assertSameSplit(self, lines):
+        for line in lines:
+            line = "{" + line + "}"  # As in LauncherMenuModel.parse_line
+            expected = split_result(
+                convert.LauncherMenuModel.pyparsing_split_line, line)
+            self.assertEqual(split_result(convert.split_tcl_line, line),
+                             expected, "Line %r" % line)
+
+    def test_edge_cases(self):
+        self.assertSameSplit(EDGE_CASES)
+
+    def test_fixtures(self):
+        self.assertSameSplit(config_lines(fixture_files()))
+
+    def test_generated_tree(self):
+        work_dir = tempfile.mkdtemp(prefix="pylauncher-tokenizer-")
+        try:
+            launcher_bench.generate_tcl_tree(work_dir, 2, 4, 50)
+            self.assertSameSplit(config_lines(
+                os.path.join(work_dir, file_name)
+                for file_name in sorted(os.listdir(work_dir))))
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def test_random_lines(self):
+        self.assertSameSplit(random_lines(2000))
+
+    def test_converted_fixtures(self):
+        for file_path in fixture_files():
+            dir_path, file_name = os.path.split(file_path)
+            models = [convert.LauncherMenuModel(dir_path, file_name, False,
+                                                tokenizer)
+                      for tokenizer in ("pyparsing", "fast")]
+            self.assertEqual(models[1].json_config, models[0].json_config,
+                             file_name)
+            self.assertEqual(models[1].menu_items, models[0].menu_items,
+                             file_name)
+            self.assertEqual(models[1].file_list, models[0].file_list,
+                             file_name)
+
+
+if __name__ == '__main__':
+    unittest.main()
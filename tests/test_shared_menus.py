@@ -0,0 +1,84 @@
+# Test of menu files included from several menus.
+#
+# File shared.json is included from menu A and from menu D (in B). It must
+# be parsed once, while level and trace of the items are those of the
+# reference through which they are reached.
+#
+# Run with: python -m unittest discover tests (or python -m pytest tests)
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, TESTS_DIR)
+from _pylauncher import pylauncher_module
+
+launcher_model = pylauncher_module("launcher_model")
+
+MENUS = {
+    "root.json": [{"type": "menu", "text": "A", "file": "a.json"},
+                  {"type": "menu", "text": "B", "file": "b.json"}],
+    "a.json": [{"type": "menu", "text": "C", "file": "shared.json"}],
+    "b.json": [{"type": "menu", "text": "D", "file": "d.json"}],
+    "d.json": [{"type": "menu", "text": "C3", "file": "shared.json"}],
+    "shared.json": [{"type": "cmd", "text": "X", "command": "echo x"}],
+}
+
+LAUNCHER_CFG = {"cmd": {"command": "bash -c \"{command}\""}}
+
+
+def texts(items):
+    return [item.text for item in items]
+
+
+class TestSharedMenus(unittest.TestCase):
+
+    def setUp(self):
+        self.menu_dir = tempfile.mkdtemp(prefix="pylauncher-shared-")
+        for file_name, items in MENUS.items():
+            with open(os.path.join(self.menu_dir, file_name), "w") as f:
+                json.dump({"menu": items}, f)
+
+    def tearDown(self):
+        shutil.rmtree(self.menu_dir, ignore_errors=True)
+
+    def load(self, lazy):
+        root = launcher_model.launcher_menu_model(
+            None, os.path.join(self.menu_dir, "root.json"), 0,
+            launcher_model.compile_launcher_cfg(LAUNCHER_CFG),
+            launcher_model.launcher_menu_loader(lazy=lazy))
+        a, b = root.menu_items
+        c = a.sub_menu.menu_items[0]
+        d = b.sub_menu.menu_items[0]
+        c3 = d.sub_menu.menu_items[0]
+        return c, c3
+
+    def test_shared_model(self):
+        for lazy in (False, True):
+            c, c3 = self.load(lazy)
+            self.assertIs(c.sub_menu, c3.sub_menu)
+
+    def test_reference_level(self):
+        for lazy in (False, True):
+            c, c3 = self.load(lazy)
+            self.assertEqual(c.level, 2)
+            self.assertEqual(c3.level, 3)
+            self.assertIn("\n\t\t\t", repr(c3))
+            self.assertNotIn("\n\t\t\t", repr(c))
+
+    def test_reference_trace(self):
+        for lazy in (False, True):
+            c, c3 = self.load(lazy)
+            x = c3.sub_menu.menu_items[0]
+            self.assertEqual(texts(x.trace_through(c)), ["A", "C"])
+            self.assertEqual(texts(x.trace_through(c3)), ["B", "D", "C3"])
+            self.assertEqual(texts(c3.trace), ["B", "D"])
+            self.assertEqual(texts(c3.references), ["B", "D", "C3"])
+
+
+if __name__ == '__main__':
+    unittest.main()